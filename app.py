@@ -5,23 +5,23 @@ Flask backend for the Quranic Q&A system with improved accuracy
 and integration with a pre-created search model
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 import json
+import hashlib
 import random
 import time
-import re
 import os
-from difflib import SequenceMatcher
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import PorterStemmer
-import string
 import logging
-from pathlib import Path
+from functools import lru_cache
 
 # Import the model wrapper
-from local_model_loader import QuranModelWrapper
+from local_model_loader import QuranModelWrapper, default_model_path, parse_reference
+from metrics import metrics
+from pattern_matcher import PatternMatcher
+from qa_index import QAIndex
+from qa_store import QASnapshot, QAStore
+from response_cache import ResponseCache
+from text_utils import normalize_urdu, preprocess_text, tokenize_urdu, combined_similarity
 
 app = Flask(__name__)
 
@@ -37,11 +37,47 @@ logger = logging.getLogger('QuranChatbot')
 DATA_FILE = os.path.join(os.path.dirname(__file__), 'qa_data.json')
 
 # Initialize the model wrapper
-model_path = Path("./models/processed_quran.pkl")
+model_path = default_model_path()
 model_wrapper = QuranModelWrapper(model_path)
 
-# Global cache for QA data
-qa_data_cache = None
+# Current QA data and its matching index, published as immutable snapshots
+qa_store = QAStore(DATA_FILE, lambda data: QAIndex(data, CATEGORY_KEYWORDS))
+
+# Seconds between checks of qa_data.json for changes; 0 disables the watcher
+QA_WATCH_INTERVAL = float(os.environ.get("QA_WATCH_INTERVAL", 2))
+
+# Model loading mode: "eager" loads and indexes everything when the app is imported
+# (with gunicorn preload_app this happens once in the master and workers share it
+# copy-on-write), "lazy" defers it to the first request that needs it
+MODEL_LOADING = os.environ.get("QURAN_MODEL_LOADING", "eager")
+
+# Verse matches returned per page by /ask and /search-verses
+VERSE_PAGE_SIZE = 5
+MAX_VERSE_PAGE_SIZE = 50
+
+# Optional artificial delay for /ask in seconds; the "thinking" pause now lives in script.js
+ASK_DELAY_SECONDS = float(os.environ.get("ASK_DELAY_SECONDS", 0))
+
+# Send per-stage timings of /ask answers in a Server-Timing header
+ASK_SERVER_TIMING = os.environ.get("ASK_SERVER_TIMING", "0") == "1"
+
+# Largest number of questions accepted by /ask-batch
+ASK_BATCH_MAX = int(os.environ.get("ASK_BATCH_MAX", 1000))
+
+# Cache of resolved /ask responses keyed on the preprocessed question
+response_cache = ResponseCache(
+    maxsize=int(os.environ.get("ASK_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("ASK_CACHE_TTL", 3600))
+)
+# Answers computed from older QA data must not be served after a reload
+qa_store.on_publish(lambda snapshot: response_cache.clear())
+
+# Pre-serialized /categories, /popular-questions and /daily-fact bodies, rebuilt for each QA snapshot
+static_payloads = None
+qa_store.on_publish(lambda snapshot: build_static_payloads(snapshot))
+
+# Seconds browsers and CDNs may reuse /categories and /popular-questions before revalidating
+STATIC_PAYLOAD_MAX_AGE = int(os.environ.get("STATIC_PAYLOAD_MAX_AGE", 300))
 
 # Category mappings for reuse
 CATEGORY_TITLES = {
@@ -62,6 +98,9 @@ CATEGORY_ICONS = {
     "islamic_history": "fa-history"
 }
 
+# Questions suggested when nothing more specific is known
+POPULAR_QUESTION_IDS = ["quran_paras", "quran_surahs", "longest_surah", "shortest_surah"]
+
 CATEGORY_KEYWORDS = {
     "structure": ["پارہ", "سورت", "آیت", "رکوع", "حروف", "الفاظ"],
     "revelation": ["نزول", "وحی", "نازل", "مکہ", "مدینہ"],
@@ -235,175 +274,120 @@ FAREWELL_WORDS = ["اللہ حافظ", "خدا حافظ", "فی امان الل
 HELP_WORDS = ["مدد", "help", "کیسے", "how to", "guide", "explain"]
 HISTORY_KEYWORDS = ["پہلا", "سب سے پہلے", "اسلام کا آغاز", "شہید", "خاتون"]
 
-# Try to pre-load the model at startup
-if model_path.exists():
-    model_wrapper.load()
-    logger.info(f"Pre-loaded model from {model_path}")
-else:
-    logger.warning(f"Model not found at {model_path}. Will try to create fallback database.")
+# Intents in priority order, checked by detect_intent
+INTENT_PATTERNS = [
+    ("history", HISTORY_KEYWORDS),
+    ("greeting", GREETING_PATTERNS),
+    ("thanks", THANKS_WORDS),
+    ("farewell", FAREWELL_WORDS),
+    ("help", HELP_WORDS)
+]
+
+# Compiled matchers, rebuilt by build_pattern_matchers()
+intent_matcher = None
+specific_question_matcher = None
 
-def load_qa_data(force_reload=False):
-    """Load the question-answer data from JSON file with optional caching"""
-    global qa_data_cache
+def build_pattern_matchers():
+    """Compile the intent and specific-question patterns into single automatons"""
+    global intent_matcher, specific_question_matcher
+    
+    # Patterns get the same letter folding as the preprocessed input they are matched against
+    intent_patterns = [(normalize_urdu(pattern).lower(), intent)
+                       for intent, patterns in INTENT_PATTERNS for pattern in patterns]
     
-    # Return cached data if available and not forcing reload
-    if qa_data_cache is not None and not force_reload:
-        return qa_data_cache
+    # Prophet questions take priority over the hardcoded FAQs
+    specific_patterns = []
+    for questions in (PROPHET_QUESTIONS, HARD_CODED_FAQS):
+        for q_type, data in questions.items():
+            specific_patterns.extend((normalize_urdu(pattern).lower(), q_type) for pattern in data["patterns"])
     
+    # Swap in complete matchers so concurrent requests never see a partial build
+    intent_matcher = PatternMatcher(intent_patterns)
+    specific_question_matcher = PatternMatcher(specific_patterns)
+    logger.info(f"Compiled {intent_matcher.pattern_count} intent and "
+                f"{specific_question_matcher.pattern_count} specific question patterns")
+
+build_pattern_matchers()
+
+def load_qa_snapshot(force_reload=False):
+    """Return the current QA snapshot, loading it from the JSON file on first use or when forced"""
     try:
-        with open(DATA_FILE, 'r', encoding='utf-8') as file:
-            qa_data_cache = json.load(file)
-            logger.info(f"Loaded QA data from {DATA_FILE}")
-            return qa_data_cache
+        # The snapshot and its index are published together, so readers never see data without it
+        return qa_store.load() if force_reload else qa_store.get()
     except Exception as e:
         logger.error(f"Error loading QA data: {e}")
-        # Return minimal data structure in case of error
-        return {"questions": [], "categories": {}, "facts": [], 
-                "greetings": [], "thank_you_responses": [], 
-                "farewell_responses": [], "not_found_responses": []}
-
-def get_question_by_id(question_id, data):
-    """Get question by ID with O(1) complexity using dictionary lookup"""
-    # Create a lookup dictionary if it doesn't exist
-    if not hasattr(get_question_by_id, "lookup_dict"):
-        get_question_by_id.lookup_dict = {}
-        
-    # Rebuild lookup if data has changed
-    if id(data) not in get_question_by_id.lookup_dict:
-        lookup = {}
-        for question in data.get("questions", []):
-            if "id" in question:
-                lookup[question["id"]] = question
-        get_question_by_id.lookup_dict[id(data)] = lookup
-    
-    # Return the question or None
-    return get_question_by_id.lookup_dict[id(data)].get(question_id)
-
-def preprocess_text(text, is_urdu=True):
-    """Clean and normalize text for better matching"""
-    if not text:
-        return ""
-        
-    # For Urdu text
-    if is_urdu:
-        # Remove Urdu punctuation
-        text = re.sub(r'[۔،؟!؛:\(\)]', ' ', text)
-    else:
-        # For English parts
-        # Remove punctuation
-        text = text.translate(str.maketrans('', '', string.punctuation))
-        # Convert to lowercase
-        text = text.lower()
-        
-    # Normalize whitespace for both
-    return re.sub(r'\s+', ' ', text).strip()
-
-def tokenize_urdu(text):
-    """Tokenize Urdu text into words"""
-    # Basic tokenization by whitespace
-    tokens = text.split()
-    # Further clean tokens
-    return [token.strip() for token in tokens if token.strip()]
-
-def advanced_similarity_score(query, reference, is_urdu=True):
-    """Calculate advanced similarity between query and reference texts"""
+        # Return minimal data structure in case of error; the snapshot is not published anywhere
+        qa_data = {"questions": [], "categories": {}, "facts": [], 
+                   "greetings": [], "thank_you_responses": [], 
+                   "farewell_responses": [], "not_found_responses": []}
+        return QASnapshot(0, qa_data, QAIndex(qa_data, CATEGORY_KEYWORDS))
+
+def load_qa_data(force_reload=False):
+    """Return the current QA data, loading it from the JSON file on first use or when forced"""
+    return load_qa_snapshot(force_reload).data
+
+def get_question_by_id(question_id, snapshot):
+    """Get question by ID with O(1) complexity using the snapshot's id map"""
+    return snapshot.questions_by_id.get(question_id)
+
+# English NLP resources, created once instead of per comparison. nltk is imported on
+# first use only: it pulls in sklearn and pandas, which the Urdu serving path never needs
+@lru_cache(maxsize=1)
+def get_english_stemmer():
+    """Return the shared NLTK Porter stemmer"""
+    from nltk.stem import PorterStemmer
+    return PorterStemmer()
+
+@lru_cache(maxsize=1)
+def get_english_stopwords():
+    """Return the NLTK English stopword set, loaded on first use"""
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+@lru_cache(maxsize=16384)
+def stem_english_word(word):
+    """Stem an English word, caching the result"""
+    return get_english_stemmer().stem(word)
+
+@lru_cache(maxsize=4096)
+def english_tokens(text):
+    """Tokenize preprocessed English text, dropping stopwords and stemming the rest"""
+    from nltk.tokenize import word_tokenize
+    stop_words = get_english_stopwords()
+    return tuple(stem_english_word(w) for w in word_tokenize(text) if w not in stop_words)
+
+def advanced_similarity_score(query, reference, is_urdu=True, threshold=None):
+    """Calculate advanced similarity between query and reference texts
+
+    Answering does not go through this function: QAIndex scores the Urdu QA
+    data with combined_similarity directly. The English path is only used by
+    the benchmarks.
+
+    When a threshold is given and cheap upper bounds show the score cannot
+    exceed it, that bound is returned instead of running the full
+    SequenceMatcher comparison.
+    """
     # Preprocess both texts
     query_processed = preprocess_text(query, is_urdu)
     reference_processed = preprocess_text(reference, is_urdu)
     
-    # Method 1: String Sequence Matching
-    sequence_similarity = SequenceMatcher(None, query_processed, reference_processed).ratio()
-    
-    # Method 2: Word Overlap
+    # Tokenize for word overlap
     if is_urdu:
         query_tokens = tokenize_urdu(query_processed)
         reference_tokens = tokenize_urdu(reference_processed)
     else:
-        # For English, use more advanced NLP
-        query_tokens = word_tokenize(query_processed)
-        reference_tokens = word_tokenize(reference_processed)
-        
-        # Remove stopwords for English
-        stop_words = set(stopwords.words('english'))
-        query_tokens = [w for w in query_tokens if w not in stop_words]
-        reference_tokens = [w for w in reference_tokens if w not in stop_words]
-        
-        # Stem words for English
-        stemmer = PorterStemmer()
-        query_tokens = [stemmer.stem(w) for w in query_tokens]
-        reference_tokens = [stemmer.stem(w) for w in reference_tokens]
+        # For English, remove stopwords and stem; reference token lists are cached across calls
+        query_tokens = english_tokens(query_processed)
+        reference_tokens = english_tokens(reference_processed)
     
-    # Count matching words
-    matching_words = sum(1 for word in query_tokens if word in reference_tokens)
-    
-    # Calculate word overlap ratio
-    total_words = len(set(query_tokens + reference_tokens))
-    word_overlap = matching_words / total_words if total_words > 0 else 0
-    
-    # Combined similarity (weighted average)
-    return (0.6 * sequence_similarity) + (0.4 * word_overlap)
+    return combined_similarity(query_processed, query_tokens, reference_processed, reference_tokens, threshold)
 
-def find_matching_question(user_input, qa_data):
+def find_matching_question(user_input, snapshot):
     """Find the best matching question using advanced methods"""
-    processed_input = preprocess_text(user_input)
-    
-    # Direct match check with higher threshold for short queries
-    for question in qa_data.get("questions", []):
-        question_text = question.get("question", "")
-        if advanced_similarity_score(processed_input, question_text) > 0.8:
-            return question
-        
-        # Check alternative phrasings
-        for alt in question.get("alternative_phrasings", []):
-            if advanced_similarity_score(processed_input, alt) > 0.8:
-                return question
-    
-    # Keyword matching with improved weighting
-    best_match = None
-    highest_score = 0
-    
-    # Lower threshold for short queries
-    threshold = 2 if len(processed_input.split()) <= 3 else 3
-    
-    for question in qa_data.get("questions", []):
-        score = 0
-        
-        # Check for keywords
-        for keyword in question.get("keywords", []):
-            if keyword.lower() in processed_input.lower():
-                # Weight longer keywords more (improved algorithm)
-                score += (len(keyword) ** 1.5) * 0.1
-        
-        # Add category weighting
-        if "category" in question and question["category"] in CATEGORY_KEYWORDS:
-            for cat_keyword in CATEGORY_KEYWORDS[question["category"]]:
-                if cat_keyword in processed_input.lower():
-                    score += 2  # Boost category relevance
-        
-        if score > highest_score:
-            highest_score = score
-            best_match = question
-    
-    # Return keyword match if score is above threshold
-    if highest_score >= threshold:
-        return best_match
-    
-    # Fuzzy matching as a fallback
-    best_match = None
-    highest_similarity = 0
-    
-    for question in qa_data.get("questions", []):
-        similarity = advanced_similarity_score(processed_input, question.get("question", ""))
-        if similarity > highest_similarity:
-            highest_similarity = similarity
-            best_match = question
-    
-    if highest_similarity > 0.5:
-        return best_match
-    
-    return None
+    # Questions, phrasings and keywords are preprocessed once in the snapshot's QA index
+    return snapshot.index.find(user_input)
 
-def get_related_questions(question, qa_data):
+def get_related_questions(question, snapshot):
     """Get related questions with smart fallback"""
     related = []
     
@@ -421,21 +405,13 @@ def get_related_questions(question, qa_data):
         
         # Get questions from the matched category or popular questions
         if matched_category:
-            cat_questions = [q for q in qa_data.get("questions", []) if q.get("category") == matched_category]
-            related = cat_questions[:3]
+            related = list(snapshot.questions_by_category.get(matched_category, ())[:3])
         else:
             # Popular questions as fallback
-            popular_ids = ["quran_paras", "quran_surahs", "longest_surah", "shortest_surah"]
-            for qid in popular_ids:
-                q = get_question_by_id(qid, qa_data)
-                if q:
-                    related.append(q)
+            related = list(snapshot.resolve_ids(POPULAR_QUESTION_IDS))
     else:
-        # Get explicitly related questions
-        for q_id in question.get("related_questions", []):
-            q = get_question_by_id(q_id, qa_data)
-            if q:
-                related.append(q)
+        # Explicitly related questions are resolved once per snapshot
+        related = list(snapshot.related_questions(question))
     
     return related[:3]  # Limit to 3 related questions
 
@@ -444,30 +420,8 @@ def detect_intent(text):
     if not text:
         return "question"  # Default
         
-    text_lower = text.lower()
-    
-    # Historical intent detection
-    if any(word in text_lower for word in HISTORY_KEYWORDS):
-        return "history"
-    
-    # Greeting detection
-    if any(greeting in text_lower for greeting in GREETING_PATTERNS):
-        return "greeting"
-    
-    # Thanks
-    if any(word in text_lower for word in THANKS_WORDS):
-        return "thanks"
-    
-    # Farewell
-    if any(farewell in text_lower for farewell in FAREWELL_WORDS):
-        return "farewell"
-    
-    # Help
-    if any(word in text_lower for word in HELP_WORDS):
-        return "help"
-    
-    # Default to question
-    return "question"
+    # One pass over the text finds the highest-priority intent pattern
+    return intent_matcher.first(text.lower()) or "question"
 
 def detect_specific_questions(user_input):
     """Detect specific high-priority questions that need direct answers"""
@@ -477,84 +431,244 @@ def detect_specific_questions(user_input):
     # Normalize user input for matching
     normalized_input = preprocess_text(user_input).lower()
     
-    # Check each question pattern in prophet questions
-    for q_type, data in PROPHET_QUESTIONS.items():
-        for pattern in data["patterns"]:
-            if pattern in normalized_input:
-                return {
-                    "type": q_type,
-                    "answer": data["answer"]
-                }
-    
-    # Check each question pattern in hardcoded FAQs
-    for q_type, data in HARD_CODED_FAQS.items():
-        for pattern in data["patterns"]:
-            if pattern in normalized_input:
-                return {
-                    "type": q_type,
-                    "answer": data["answer"]
-                }
+    # Prophet questions and hardcoded FAQs are matched in one pass, in priority order
+    q_type = specific_question_matcher.first(normalized_input)
+    if q_type:
+        data = PROPHET_QUESTIONS.get(q_type) or HARD_CODED_FAQS[q_type]
+        return {
+            "type": q_type,
+            "answer": data["answer"]
+        }
     
     return None
 
+def search_verses(query, offset=0, limit=VERSE_PAGE_SIZE):
+    """Return one page of verse matches for the query, best first"""
+    offset = max(0, offset)
+    limit = max(1, min(limit, MAX_VERSE_PAGE_SIZE))
+    
+    # Only offset + limit matches are selected and formatted, never the full result list
+    return verse_page(model_wrapper.search(query, top_k=offset + limit), offset, limit)
+
+def verse_page(results, offset, limit):
+    """Turn a model search result holding at least offset + limit matches into one page"""
+    if "error" in results:
+        return results
+    
+    matches = [results["primary_match"]] + results["other_matches"] if results["primary_match"] else []
+    page = [
+        {"verse": match["verse"], "reference": match["reference"], "score": round(match["score"], 4)}
+        for match in matches[offset:offset + limit]
+    ]
+    next_offset = offset + len(page)
+    return {
+        "verses": page,
+        "offset": offset,
+        "total_matches": results["total_matches"],
+        "next_offset": next_offset if next_offset < results["total_matches"] else None
+    }
+
+def verse_suggestions(query, verses):
+    """Create follow-up suggestions from the verses after the primary match"""
+    suggestions = []
+    related_queries = []
+    
+    for match in verses[1:]:
+        # Extract a potential follow-up question from the verse
+        verse_parts = match['verse'].split('،')
+        if len(verse_parts) > 1:
+            q = verse_parts[0] + "؟"
+            if len(q) > 10 and len(q) < 60:  # Reasonable question length
+                related_queries.append(q)
+                
+    # If we have related queries, add them to suggestions
+    if related_queries:
+        suggestions.extend(related_queries[:2])
+    
+    # Add some general follow-up questions
+    suggestions.append(f"مزید معلومات {query} کے بارے میں")
+    return suggestions
+
+class SearchError(Exception):
+    """The verse search failed, as opposed to finding nothing"""
+
 def search_quran(query):
-    """Search Quran using the loaded model and include all relevant matches"""
-    if not query or not model_wrapper.loaded:
+    """Search Quran using the loaded model and return the first page of matches
+
+    Raises SearchError when the search itself fails, so callers can answer
+    without caching the not-found response.
+    """
+    if not query or not model_wrapper.ensure_loaded():
         return None
         
     try:
-        # Get search results
-        results = model_wrapper.search(query)
-        
-        if "error" in results:
-            logger.warning(f"Search error: {results['error']}")
-            return None
-            
-        if results["primary_match"]:
-            primary = results["primary_match"]
-            # Format the answer with the verse and reference (improved spacing)
-            answer = f"{primary['verse']}\n\n📖 {primary['reference']}"
-            
-            # Include all matches in the answer if available
-            other_matches = results.get("other_matches", [])
-            if other_matches:
-                answer += "\n\n**مزید متعلقہ نتائج:**\n"
-                for i, match in enumerate(other_matches, 1):
-                    other_match_text = f"{i}. {match['verse']}\n📖 {match['reference']}"
-                    answer += other_match_text + "\n\n"
-            
-            # Create related suggestions from other matches
-            suggestions = []
-            related_queries = []
-            
-            for match in other_matches:
-                # Extract a potential follow-up question from the verse
-                verse_parts = match['verse'].split('،')
-                if len(verse_parts) > 1:
-                    q = verse_parts[0] + "؟"
-                    if len(q) > 10 and len(q) < 60:  # Reasonable question length
-                        related_queries.append(q)
-                        
-            # If we have related queries, add them to suggestions
-            if related_queries:
-                suggestions.extend(related_queries[:2])
-            
-            # Add some general follow-up questions
-            suggestions.append(f"مزید معلومات {query} کے بارے میں")
-            
-            return {
-                "answer": answer,
-                "suggestions": suggestions
-            }
+        # Get the first page of search results
+        results = search_verses(query)
         
-        return None
+        return quran_search_result(query, results)
         
     except Exception as e:
         logger.error(f"Error in search_quran: {e}")
+        raise SearchError(str(e)) from e
+
+def search_quran_batch(queries):
+    """Search Quran for several queries in one batch, returning search_quran() results in input order"""
+    if not queries or not model_wrapper.ensure_loaded():
+        return [None] * len(queries)
+    
+    try:
+        batch = model_wrapper.search_batch(queries, top_k=VERSE_PAGE_SIZE)
+        return [
+            quran_search_result(query, verse_page(results, 0, VERSE_PAGE_SIZE)) if query else None
+            for query, results in zip(queries, batch)
+        ]
+    
+    except Exception as e:
+        logger.error(f"Error in search_quran_batch: {e}")
+        raise SearchError(str(e)) from e
+
+def quran_search_result(query, results):
+    """Build the search_quran() result from the first page of verse matches, or None"""
+    if "error" in results:
+        logger.warning(f"Search error: {results['error']}")
         return None
+        
+    if results["verses"]:
+        primary = results["verses"][0]
+        # Format the answer with the verse and reference (improved spacing)
+        answer = f"{primary['verse']}\n\n📖 {primary['reference']}"
+        
+        # Further matches are fetched page by page from /search-verses
+        return {
+            "answer": answer,
+            "suggestions": verse_suggestions(query, results["verses"]),
+            "verses": results["verses"],
+            "total_matches": results["total_matches"],
+            "next_offset": results["next_offset"]
+        }
+    
+    return None
+
+def answer_context(snapshot=None, generation=None):
+    """Return the (snapshot, cache generation) to answer with, loading the current snapshot if none is given
+
+    The generation must be read before the snapshot is fetched, or a reload
+    in between lets answers from the old data be cached under the new
+    generation. Callers that pass a snapshot without a generation get None
+    when the snapshot is no longer the published one, and nothing is cached.
+    """
+    if generation is None:
+        generation = response_cache.generation
+        if snapshot is not None and snapshot is not qa_store.snapshot:
+            generation = None
+    if snapshot is None:
+        snapshot = load_qa_snapshot()
+    return snapshot, generation
+
+def process_question(user_input, qa_data=None):
+    """Process user input and return appropriate response
 
-def process_question(user_input, qa_data):
-    """Process user input and return appropriate response"""
+    qa_data is a QA snapshot, a plain QA data dict, or None for the current data.
+    """
+    if qa_data is None:
+        snapshot = load_qa_snapshot()
+    elif isinstance(qa_data, QASnapshot):
+        snapshot = qa_data
+    elif qa_store.snapshot is not None and qa_store.snapshot.data is qa_data:
+        snapshot = qa_store.snapshot
+    else:
+        # Data that never went through the store gets its own short-lived snapshot
+        snapshot = QASnapshot(0, qa_data, QAIndex(qa_data, CATEGORY_KEYWORDS))
+    try:
+        return render_response(resolve_question(user_input, snapshot))
+    except SearchError:
+        return render_response(search_model_response(user_input, None, snapshot))
+
+def answer_question(user_input, snapshot=None, generation=None):
+    """Answer user input, reusing the cached resolution of an identical preprocessed question
+
+    snapshot and generation default to the current ones (see answer_context).
+    """
+    snapshot, generation = answer_context(snapshot, generation)
+    key = preprocess_text(user_input)
+    with metrics.stage("cache_lookup"):
+        resolved = response_cache.get(key)
+    if resolved is None:
+        try:
+            resolved = resolve_question(key, snapshot)
+        except SearchError:
+            # Answer as not found, but leave the next asker to retry the search
+            resolved = search_model_response(key, None, snapshot)
+            metrics.set_source("error")
+        else:
+            response_cache.set(key, resolved, generation)
+            metrics.set_source(answer_source(resolved))
+    else:
+        metrics.set_source("cache")
+    return render_response(resolved)
+
+def answer_source(resolved):
+    """Label for what produced a resolved response, used by the latency metrics"""
+    return resolved.get('source') or resolved.get('intent', 'unknown')
+
+def answer_questions(user_inputs, snapshot=None, generation=None):
+    """Answer a list of questions in input order, resolving each distinct preprocessed question once
+
+    snapshot and generation default to the current ones (see answer_context).
+    """
+    snapshot, generation = answer_context(snapshot, generation)
+    keys = [preprocess_text(user_input) for user_input in user_inputs]
+    resolved = {}
+    pending = []
+    
+    for key in dict.fromkeys(keys):
+        cached = response_cache.get(key)
+        if cached is not None:
+            resolved[key] = cached
+            continue
+        direct = resolve_direct_answer(key, snapshot)
+        if direct is not None:
+            resolved[key] = direct
+            response_cache.set(key, direct, generation)
+        else:
+            pending.append(key)
+    
+    # Everything left needs a verse search, done as one batch
+    try:
+        search_results = search_quran_batch(pending)
+        failed = False
+    except SearchError:
+        search_results = [None] * len(pending)
+        failed = True
+    for key, search_result in zip(pending, search_results):
+        resolved[key] = search_model_response(key, search_result, snapshot)
+        # A failed search's not-found answer must not be served for the whole TTL
+        if not failed:
+            response_cache.set(key, resolved[key], generation)
+    
+    return [render_response(resolved[key]) for key in keys]
+
+def render_response(resolved):
+    """Build the final response, picking a random answer where the resolution allows several"""
+    # Copy so cached resolutions are never modified
+    return {
+        ('answer' if key == 'answer_choices' else key): (random.choice(value) if key == 'answer_choices' else value)
+        for key, value in resolved.items()
+    }
+
+def resolve_question(user_input, snapshot):
+    """Resolve user input to a response; randomized answers are left as 'answer_choices'"""
+    resolved = resolve_direct_answer(user_input, snapshot)
+    if resolved is not None:
+        return resolved
+    
+    # Try using the search model if no match found; loads it on first use
+    with metrics.stage("search_quran"):
+        search_result = search_quran(user_input)
+    return search_model_response(user_input, search_result, snapshot)
+
+def resolve_direct_answer(user_input, snapshot):
+    """Resolve input that needs no verse search (specific answers, intents, QA matches), else None"""
     if not user_input:
         return {
             'answer': "کوئی سوال نہیں ملا۔ براہ کرم دوبارہ کوشش کریں۔",
@@ -562,14 +676,19 @@ def process_question(user_input, qa_data):
             'intent': 'unknown'
         }
     
+    # A verse reference ("البقرة 255", "2:255") is answered by the verse lookup, skip the QA matching
+    if parse_reference(user_input):
+        return None
+    
     # First check for specific high-priority questions
-    specific_question = detect_specific_questions(user_input)
+    with metrics.stage("detect_specific_questions"):
+        specific_question = detect_specific_questions(user_input)
     if specific_question:
         related = []
         if specific_question["type"].startswith("prophet_") or specific_question["type"] == "most_mentioned_prophet":
             # Get related questions for prophets
-            for q in qa_data.get("questions", []):
-                if q.get("category") == "prophets" and q.get("id", "") != specific_question["type"]:
+            for q in snapshot.questions_by_category.get("prophets", ()):
+                if q.get("id", "") != specific_question["type"]:
                     related.append(q)
                     if len(related) >= 3:
                         break
@@ -583,19 +702,20 @@ def process_question(user_input, qa_data):
         }
     
     # Detect intent
-    intent = detect_intent(user_input)
+    with metrics.stage("detect_intent"):
+        intent = detect_intent(user_input)
     
     if intent == "greeting":
         return {
-            'answer': random.choice(qa_data.get("greetings", ["وعلیکم السلام!"])),
-            'suggestions': [q["question"] for q in get_related_questions(None, qa_data)],
+            'answer_choices': snapshot.data.get("greetings") or ["وعلیکم السلام!"],
+            'suggestions': [q["question"] for q in get_related_questions(None, snapshot)],
             'confidence': 'high',
             'intent': 'greeting'
         }
     
     if intent == "thanks":
         return {
-            'answer': random.choice(qa_data.get("thank_you_responses", ["آپ کا شکریہ!"])),
+            'answer_choices': snapshot.data.get("thank_you_responses") or ["آپ کا شکریہ!"],
             'suggestions': ["مزید سوالات", "اللہ حافظ"],
             'confidence': 'high',
             'intent': 'thanks'
@@ -603,7 +723,7 @@ def process_question(user_input, qa_data):
     
     if intent == "farewell":
         return {
-            'answer': random.choice(qa_data.get("farewell_responses", ["اللہ حافظ!"])),
+            'answer_choices': snapshot.data.get("farewell_responses") or ["اللہ حافظ!"],
             'farewell': True,
             'confidence': 'high',
             'intent': 'farewell'
@@ -617,17 +737,18 @@ def process_question(user_input, qa_data):
 - قرآن میں کس پیغمبر کا سب سے زیادہ ذکر ہے؟"""
         return {
             'answer': help_text,
-            'suggestions': [q["question"] for q in get_related_questions(None, qa_data)[:4]],
+            'suggestions': [q["question"] for q in get_related_questions(None, snapshot)[:4]],
             'confidence': 'high',
             'intent': 'help'
         }
     
     # Process as a question
-    match = find_matching_question(user_input, qa_data)
+    with metrics.stage("find_matching_question"):
+        match = find_matching_question(user_input, snapshot)
     
     if match:
         # Direct match from QA database
-        related = get_related_questions(match, qa_data)
+        related = get_related_questions(match, snapshot)
         return {
             'answer': match["answer"],
             'confidence': 'high',
@@ -635,54 +756,274 @@ def process_question(user_input, qa_data):
             'intent': 'question',
             'source': 'qa_database'
         }
-    else:
-        # Try using the search model if no match found
-        search_result = None
-        if model_wrapper.loaded:
-            search_result = search_quran(user_input)
+    
+    return None
+
+def search_model_response(user_input, search_result, snapshot):
+    """Build the response for a verse search result, or the not-found response when there is none"""
+    if search_result:
+        # Match from search model
+        return {
+            'answer': search_result["answer"],
+            'confidence': 'medium',
+            'suggestions': search_result["suggestions"],
+            'intent': 'question',
+            'source': 'search_model',
+            'query': user_input,
+            'verses': search_result["verses"],
+            'total_matches': search_result["total_matches"],
+            'next_offset': search_result["next_offset"]
+        }
+    
+    # No match found
+    return {
+        'answer_choices': snapshot.data.get("not_found_responses") or ["معاف کیجیے، میں اس سوال کا جواب نہیں جانتا۔"],
+        'confidence': 'none',
+        'suggestions': [q["question"] for q in get_related_questions(None, snapshot)],
+        'intent': 'unknown'
+    }
+
+def sse_event(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def stream_question(user_input, snapshot, generation):
+    """Yield the SSE events of stream_answer, timing the whole stream as one request"""
+    with metrics.trace():
+        yield from stream_answer(user_input, snapshot, generation)
+
+def stream_answer(user_input, snapshot, generation):
+    """Yield SSE events: direct answers at once, verse matches one by one as they are found"""
+    # Flush something immediately so the client knows the question is being handled
+    yield sse_event('start', {})
+    
+    key = preprocess_text(user_input)
+    with metrics.stage("cache_lookup"):
+        resolved = response_cache.get(key)
+    if resolved is not None:
+        metrics.set_source("cache")
+        yield sse_event('answer', render_response(resolved))
+        yield sse_event('done', {})
+        return
+    
+    resolved = resolve_direct_answer(key, snapshot)
+    
+    if resolved is None:
+        verses = []
+        stats = {}
+        failed = False
+        try:
+            # Includes the time spent sending each match, as the search resumes only once it is sent
+            with metrics.stage("search_quran"):
+                if key and model_wrapper.ensure_loaded():
+                    for match in model_wrapper.iter_search(key, top_k=VERSE_PAGE_SIZE, stats=stats):
+                        verse = {"verse": match["verse"], "reference": match["reference"], "score": round(match["score"], 4)}
+                        if not verses:
+                            yield sse_event('answer', {
+                                'answer': f"{verse['verse']}\n\n📖 {verse['reference']}",
+                                'confidence': 'medium',
+                                'intent': 'question',
+                                'source': 'search_model',
+                                'query': key
+                            })
+                        else:
+                            yield sse_event('verse', verse)
+                        verses.append(verse)
+        except Exception as e:
+            logger.error(f"Error in stream_question: {e}")
+            failed = True
         
-        if search_result:
-            # Match from search model
-            return {
-                'answer': search_result["answer"],
-                'confidence': 'medium',
-                'suggestions': search_result["suggestions"],
-                'intent': 'question',
-                'source': 'search_model'
-            }
-        else:
-            # No match found
-            not_found = random.choice(qa_data.get("not_found_responses", 
-                              ["معاف کیجیے، میں اس سوال کا جواب نہیں جانتا۔"]))
-            return {
-                'answer': not_found,
-                'confidence': 'none',
-                'suggestions': [q["question"] for q in get_related_questions(None, qa_data)],
-                'intent': 'unknown'
+        search_result = None
+        if verses:
+            total_matches = stats.get("total_matches", len(verses))
+            search_result = {
+                "answer": f"{verses[0]['verse']}\n\n📖 {verses[0]['reference']}",
+                "suggestions": verse_suggestions(key, verses),
+                "verses": verses,
+                "total_matches": total_matches,
+                "next_offset": len(verses) if len(verses) < total_matches else None
             }
+        resolved = search_model_response(key, search_result, snapshot)
+        metrics.set_source("error" if failed else answer_source(resolved))
+        # A failed search's partial or not-found answer must not be served for the whole TTL
+        if not failed:
+            response_cache.set(key, resolved, generation)
+        
+        if verses:
+            yield sse_event('done', {
+                'suggestions': resolved['suggestions'],
+                'total_matches': resolved['total_matches'],
+                'next_offset': resolved['next_offset']
+            })
+            return
+    else:
+        response_cache.set(key, resolved, generation)
+        metrics.set_source(answer_source(resolved))
+    
+    yield sse_event('answer', render_response(resolved))
+    yield sse_event('done', {})
+
+def serialize_payload(payload):
+    """Serialize a payload once, returning (body, etag); the hash keeps ETags equal across workers"""
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return body, hashlib.sha1(body).hexdigest()
+
+def build_static_payloads(snapshot):
+    """Pre-serialize the QA-derived GET payloads for a snapshot and publish them"""
+    global static_payloads
+    facts = snapshot.data.get("facts", ["قرآن میں 114 سورتیں ہیں۔"])
+    static_payloads = {
+        'version': snapshot.version,
+        'categories': serialize_payload(category_listing(snapshot)),
+        'popular_questions': serialize_payload(popular_listing(snapshot)),
+        'fact_fragments': [json.dumps(fact, ensure_ascii=False).encode('utf-8') for fact in facts]
+    }
+    return static_payloads
+
+def get_static_payloads():
+    """Return the pre-serialized payloads of the current QA snapshot"""
+    snapshot = load_qa_snapshot()
+    payloads = static_payloads
+    if snapshot is not qa_store.snapshot:
+        # QA data failed to load; serve the fallback snapshot
+        return build_static_payloads(snapshot)
+    if payloads is None or payloads['version'] != snapshot.version:
+        # Only between a snapshot being published and its payloads being built
+        return build_static_payloads(snapshot)
+    return payloads
+
+def static_payload_response(name):
+    """Serve a pre-serialized payload with ETag and Cache-Control, answering 304 when it is unchanged"""
+    body, etag = get_static_payloads()[name]
+    headers = {'ETag': f'"{etag}"', 'Cache-Control': f'public, max-age={STATIC_PAYLOAD_MAX_AGE}'}
+    if request.if_none_match.contains_weak(etag):
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype='application/json', headers=headers)
 
 # Routes
 @app.route('/')
 def home():
     """Render the home page"""
-    # Ensure model is loaded
-    if not model_wrapper.loaded and model_path.exists():
-        model_wrapper.load()
     return render_template('index.html')
 
+# Request body parsing shared with asgi.py; each raises ValueError with the message for a 400
+def string_field(body, name):
+    """Return a string field of a JSON body object, '' when absent"""
+    value = body.get(name, '')
+    if not isinstance(value, str):
+        raise ValueError(f"'{name}' must be a string")
+    return value
+
+def batch_questions(body):
+    """Return the question list of an /ask-batch body"""
+    questions = body.get('questions')
+    if not isinstance(questions, list) or not all(isinstance(q, str) for q in questions):
+        raise ValueError("'questions' must be a list of strings")
+    if len(questions) > ASK_BATCH_MAX:
+        raise ValueError(f"At most {ASK_BATCH_MAX} questions per batch")
+    return questions
+
+def verse_page_request(body):
+    """Return (query, offset, limit) of a /search-verses body"""
+    query = string_field(body, 'query')
+    try:
+        offset = int(body.get('offset', 0))
+        limit = int(body.get('limit', VERSE_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError('offset and limit must be integers') from None
+    return query, offset, limit
+
+def verse_page_payload(query, offset, limit):
+    """Build the /search-verses payload; it holds an 'error' key when the search failed"""
+    if not query or not model_wrapper.ensure_loaded():
+        return {'verses': [], 'offset': offset, 'total_matches': 0, 'next_offset': None}
+    return search_verses(query, offset, limit)
+
+def json_string_field(name):
+    """Return a string field of the JSON request body ('' when absent), or None when it is not a string"""
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return None
+    try:
+        return string_field(body, name)
+    except ValueError:
+        return None
+
 @app.route('/ask', methods=['POST'])
 def ask():
     """Process the user's question and return an answer"""
-    user_input = request.json.get('question', '')
-    qa_data = load_qa_data()
+    user_input = json_string_field('question')
+    if user_input is None:
+        return jsonify({'error': "'question' must be a string"}), 400
+    # Read the generation first: a reload published after it clears the cache, so answers
+    # from the old snapshot are not stored
+    generation = response_cache.generation
+    # The whole request is answered from this one snapshot, even if a reload publishes a new one
+    snapshot = load_qa_snapshot()
+    
+    # Server-side delay is off by default so it doesn't cap worker throughput
+    if ASK_DELAY_SECONDS > 0:
+        time.sleep(ASK_DELAY_SECONDS)
+    
+    # Process the question using our improved engine, cached per normalized question
+    with metrics.trace() as trace:
+        result = answer_question(user_input, snapshot, generation)
+    
+    response = jsonify(result)
+    if ASK_SERVER_TIMING and trace.stages:
+        response.headers['Server-Timing'] = trace.server_timing()
+    return response
+
+@app.route('/ask-batch', methods=['POST'])
+def ask_batch():
+    """Answer a list of questions, returning the answers in the same order"""
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    try:
+        questions = batch_questions(body)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # Add slight delay to simulate thinking
-    time.sleep(0.2)
+    return jsonify({'answers': answer_questions(questions)})
+
+@app.route('/ask-stream', methods=['POST'])
+def ask_stream():
+    """Answer the user's question as a stream of Server-Sent Events"""
+    user_input = json_string_field('question')
+    if user_input is None:
+        return jsonify({'error': "'question' must be a string"}), 400
+    generation = response_cache.generation
+    snapshot = load_qa_snapshot()
     
-    # Process the question using our improved engine
-    result = process_question(user_input, qa_data)
+    return Response(
+        stream_with_context(stream_question(user_input, snapshot, generation)),
+        mimetype='text/event-stream',
+        # Stop proxies from buffering the stream
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Expose answer latency histograms and cache counters in Prometheus text format"""
+    if not metrics.enabled:
+        return jsonify({'error': 'Metrics are disabled'}), 404
     
-    return jsonify(result)
+    cache = response_cache.stats()
+    body = metrics.render([
+        "# HELP quran_ask_cache_hits_total Response cache hits",
+        "# TYPE quran_ask_cache_hits_total counter",
+        f"quran_ask_cache_hits_total {cache['hits']}",
+        "# HELP quran_ask_cache_misses_total Response cache misses",
+        "# TYPE quran_ask_cache_misses_total counter",
+        f"quran_ask_cache_misses_total {cache['misses']}"
+    ])
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Return hit/miss counters of the /ask response cache"""
+    return jsonify(response_cache.stats())
 
 @app.route('/check-model', methods=['GET'])
 def check_model():
@@ -717,47 +1058,41 @@ def check_model():
 @app.route('/popular-questions')
 def popular_questions():
     """Return a list of popular questions for suggestions"""
-    qa_data = load_qa_data()
-    popular_ids = ["quran_paras", "quran_surahs", "longest_surah", "shortest_surah"]
-    popular = []
-    
-    for q_id in popular_ids:
-        q = get_question_by_id(q_id, qa_data)
-        if q:
-            popular.append(q["question"])
-    
-    return jsonify({'questions': popular})
+    return static_payload_response('popular_questions')
+
+def popular_listing(snapshot):
+    """Build the /popular-questions payload from a QA snapshot"""
+    return {'questions': [q["question"] for q in snapshot.resolve_ids(POPULAR_QUESTION_IDS)]}
 
 @app.route('/daily-fact')
 def daily_fact():
     """Return two random Quranic facts"""
-    qa_data = load_qa_data()
-    facts = random.sample(qa_data.get("facts", ["قرآن میں 114 سورتیں ہیں۔"]), 
-                        min(2, len(qa_data.get("facts", ["قرآن میں 114 سورتیں ہیں۔"]))))
-    return jsonify({'facts': facts})
+    fragments = get_static_payloads()['fact_fragments']
+    facts = random.sample(fragments, min(2, len(fragments)))
+    # The facts are already serialized; a new pair is picked for every request, so never cache it
+    response = Response(b'{"facts":[' + b','.join(facts) + b']}', mimetype='application/json')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
 
 @app.route('/categories')
 @app.route('/categories')
 def get_categories():
     """Return categories and their questions"""
-    qa_data = load_qa_data()
+    return static_payload_response('categories')
+
+def category_listing(snapshot):
+    """Build the /categories payload from a QA snapshot"""
     result = {}
     
-    # Group questions by category from database
-    category_questions = {}
-    for question in qa_data.get("questions", []):
-        if "category" in question:
-            category = question["category"]
-            if category not in category_questions:
-                category_questions[category] = []
-            category_questions[category].append(question["question"])
+    # Questions are grouped by category once per QA snapshot
+    category_questions = snapshot.questions_by_category
     
     # Create result object for database categories
     for category, questions in category_questions.items():
         result[category] = {
             "title": CATEGORY_TITLES.get(category, category),
             "icon": CATEGORY_ICONS.get(category, "fa-question"),
-            "questions": questions[:4]  # Limit to 4 questions per category
+            "questions": [q["question"] for q in questions[:4]]  # Limit to 4 questions per category
         }
     
     # Now add HARD_CODED categories manually
@@ -774,38 +1109,49 @@ def get_categories():
     }
 
     
-    return jsonify(result)
+    return result
 
 
 @app.route('/search', methods=['POST'])
 def search():
     """Search for questions matching a query"""
-    query = request.json.get('query', '')
-    qa_data = load_qa_data()
-    
+    query = json_string_field('query')
+    if query is None:
+        return jsonify({'error': "'query' must be a string"}), 400
+    return jsonify(search_questions(query, load_qa_snapshot()))
+
+def search_questions(query, snapshot):
+    """Build the /search payload: up to 5 questions whose text contains the query, best match first"""
     if len(query) < 2:
-        return jsonify({'results': []})
-    
-    results = []
-    for q in qa_data.get("questions", []):
-        # Check main question
-        if query.lower() in q["question"].lower():
-            results.append({
-                'question': q["question"],
-                'preview': q["answer"][:50] + "..." if len(q["answer"]) > 50 else q["answer"]
-            })
-            continue
-        
-        # Check alternative phrasings
-        for alt in q.get("alternative_phrasings", []):
-            if query.lower() in alt.lower():
-                results.append({
-                    'question': q["question"],
-                    'preview': q["answer"][:50] + "..." if len(q["answer"]) > 50 else q["answer"]
-                })
-                break
+        return {'results': []}
+    
+    # Questions, phrasings and keywords are indexed by n-gram once per QA snapshot
+    matches = snapshot.typeahead.search(query, limit=5)
+    results = [
+        {
+            'question': q["question"],
+            'preview': q["answer"][:50] + "..." if len(q["answer"]) > 50 else q["answer"]
+        }
+        for q in matches
+    ]
+    
+    return {'results': results}
+
+@app.route('/search-verses', methods=['POST'])
+def search_verses_page():
+    """Return a further page of verse matches for a query"""
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    try:
+        query, offset, limit = verse_page_request(body)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    return jsonify({'results': results[:5]})  # Limit to 5 results
+    results = verse_page_payload(query, offset, limit)
+    if "error" in results:
+        return jsonify(results), 500
+    return jsonify(results)
 
 @app.route('/load-model', methods=['POST'])
 def load_model():
@@ -827,6 +1173,8 @@ def load_model():
         success = model_wrapper.load()
         
         if success:
+            # Answers that fell through to not-found may now come from the model
+            response_cache.clear()
             return jsonify({
                 'success': True,
                 'message': 'Model loaded successfully',
@@ -847,35 +1195,15 @@ def load_model():
 def reload_qa_data():
     """API endpoint to reload the QA data"""
     try:
-        # Store the current data for comparison
-        old_data = None
-        qa_file = Path(DATA_FILE)
-        if qa_file.exists():
-            try:
-                with open(qa_file, "r", encoding="utf-8") as f:
-                    old_data = json.load(f)
-            except Exception as e:
-                logger.error(f"Failed to load existing QA data: {e}")
-        
-        # Force reload from file
-        global qa_data_cache
-        qa_data_cache = None  # Clear cache
-        new_data = load_qa_data(force_reload=True)
+        # The published snapshot is the old data; the file is only read once, for the new one
+        old_snapshot = qa_store.snapshot
         
-        # Check if data was successfully loaded
-        if not new_data:
-            return jsonify({
-                'success': False,
-                'message': 'Failed to load new QA data'
-            }), 500
+        # Requests keep using the old snapshot until the new one is built and swapped in
+        new_snapshot = qa_store.load()
         
         # Compare data sizes to give feedback
-        old_count = len(old_data.get("questions", [])) if old_data else 0
-        new_count = len(new_data.get("questions", [])) if new_data else 0
-        
-        # Reset the lookup dictionary in get_question_by_id
-        if hasattr(get_question_by_id, "lookup_dict"):
-            get_question_by_id.lookup_dict = {}
+        old_count = len(old_snapshot.data.get("questions", [])) if old_snapshot else 0
+        new_count = len(new_snapshot.data.get("questions", []))
         
         return jsonify({
             'success': True,
@@ -890,13 +1218,24 @@ def reload_qa_data():
             'error': str(e)
         }), 500
 
+def start_qa_watcher():
+    """Reload qa_data.json in the background when it changes; call once in each serving process"""
+    qa_store.start_watching(QA_WATCH_INTERVAL)
+
+def warmup():
+    """Load the QA data and indexes, and load and index the model, once"""
+    load_qa_data()
+    if not model_path.exists():
+        logger.warning(f"Model not found at {model_path}. Verse search is disabled.")
+        return False
+    if model_wrapper.ensure_loaded():
+        logger.info(f"Pre-loaded model from {model_path}")
+        return True
+    return False
+
+if MODEL_LOADING == "eager":
+    warmup()
+
 if __name__ == '__main__':
-    # Try to pre-load the model when starting the server
-    if model_path.exists() and not model_wrapper.loaded:
-        try:
-            model_wrapper.load()
-            logger.info(f"Pre-loaded model from {model_path}")
-        except Exception as e:
-            logger.error(f"Failed to pre-load model: {e}")
-    
-    app.run(debug=True)
\ No newline at end of file
+    start_qa_watcher()
+    app.run(debug=True)
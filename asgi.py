@@ -0,0 +1,288 @@
+# asgi.py
+"""
+ASGI entry point for the chatbot.
+
+/ask, /ask-stream, /ask-batch, /search and /search-verses are served by
+async handlers. Their work runs on a bounded thread pool, so the event loop
+keeps accepting connections while searches are running; /ask-stream sends
+each event as soon as its thread produces it. Requests beyond the pool size
+wait in a short queue. Once the queue is full, new requests get a 503 with
+Retry-After instead of piling up behind slow searches. /categories and
+/popular-questions are pre-serialized and sent straight from the event
+loop with ETag support. All other routes are passed through to the Flask
+app, which runs them one at a time on a single thread.
+
+    uvicorn asgi:app
+    gunicorn asgi:app -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from functools import partial
+
+from asgiref.wsgi import WsgiToAsgi
+
+import app as chatbot
+from metrics import metrics
+
+logger = logging.getLogger('QuranChatbotASGI')
+
+# Requests handled at once, one executor thread each
+ASYNC_CONCURRENCY = int(os.environ.get("ASYNC_CONCURRENCY", 4))
+# Admitted requests allowed to wait for a thread before new ones are shed
+ASYNC_QUEUE_DEPTH = int(os.environ.get("ASYNC_QUEUE_DEPTH", 16))
+# Seconds a shed client is asked to wait before retrying
+ASYNC_RETRY_AFTER = int(os.environ.get("ASYNC_RETRY_AFTER", 1))
+
+
+class AdmissionLimiter:
+    """Runs calls on a bounded thread pool, rejecting them once the wait queue is full"""
+
+    def __init__(self, concurrency, queue_depth):
+        self.capacity = concurrency + queue_depth
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='ask')
+        # Admitted calls that are running or queued; only touched from the event loop
+        self.pending = 0
+        self.rejected = 0
+
+    def admit(self):
+        """Reserve a slot for a request, or return False when the queue is full"""
+        if self.pending >= self.capacity:
+            self.rejected += 1
+            return False
+        self.pending += 1
+        return True
+
+    async def run(self, func, *args):
+        """Run func on the pool in an admitted slot, releasing it once the call has finished"""
+        loop = asyncio.get_running_loop()
+        future = self.executor.submit(func, *args)
+        # Release on completion, not on cancellation, so a disconnected client's search still counts
+        future.add_done_callback(lambda f: loop.call_soon_threadsafe(self.release))
+        return await asyncio.wrap_future(future)
+
+    async def stream(self, events):
+        """Run a generator on the pool in an admitted slot, yielding its items as they are produced
+
+        The generator runs start to finish on one thread, so context
+        variables it sets (such as the metrics trace) stay valid.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        cancelled = threading.Event()
+        future = self.executor.submit(drain, events, loop, queue, cancelled)
+        future.add_done_callback(lambda f: loop.call_soon_threadsafe(self.release))
+        try:
+            while (item := await queue.get()) is not None:
+                yield item
+        finally:
+            # Stops the generator early when the client has gone away
+            cancelled.set()
+
+    def release(self):
+        self.pending -= 1
+
+
+def drain(events, loop, queue, cancelled):
+    """Hand each item of a generator to an asyncio queue, then None; runs on a pool thread"""
+    try:
+        for item in events:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+            if cancelled.is_set():
+                break
+    except Exception as e:
+        logger.error(f"Error producing stream: {e}")
+    finally:
+        events.close()
+        loop.call_soon_threadsafe(queue.put_nowait, None)
+
+
+limiter = AdmissionLimiter(ASYNC_CONCURRENCY, ASYNC_QUEUE_DEPTH)
+flask_app = WsgiToAsgi(chatbot.app)
+
+
+def ask(question):
+    """Process the user's question and return the status, answer and any extra headers"""
+    # Generation before snapshot, as in the Flask route
+    generation = chatbot.response_cache.generation
+    snapshot = chatbot.load_qa_snapshot()
+    # The trace lives in the executor thread that does the work
+    with metrics.trace() as trace:
+        result = chatbot.answer_question(question, snapshot, generation)
+    if chatbot.ASK_SERVER_TIMING and trace.stages:
+        return 200, result, [(b'server-timing', trace.server_timing().encode())]
+    return 200, result, []
+
+
+def ask_batch(questions):
+    """Answer a list of questions in the same order"""
+    return 200, {'answers': chatbot.answer_questions(questions)}, []
+
+
+def ask_stream(question):
+    """Yield the Server-Sent Events answering the question; everything runs on the pool thread"""
+    generation = chatbot.response_cache.generation
+    snapshot = chatbot.load_qa_snapshot()
+    for event in chatbot.stream_question(question, snapshot, generation):
+        yield event.encode('utf-8')
+
+
+def search(query):
+    """Search for questions matching a query"""
+    return 200, chatbot.search_questions(query, chatbot.load_qa_snapshot()), []
+
+
+def search_verses(page_request):
+    """Return a further page of verse matches for a query"""
+    results = chatbot.verse_page_payload(*page_request)
+    return (500 if "error" in results else 200), results, []
+
+
+# (method, path) -> (handler, parser of the JSON body into the handler's argument)
+ROUTES = {
+    ('POST', '/ask'): (ask, partial(chatbot.string_field, name='question')),
+    ('POST', '/ask-batch'): (ask_batch, chatbot.batch_questions),
+    ('POST', '/search'): (search, partial(chatbot.string_field, name='query')),
+    ('POST', '/search-verses'): (search_verses, chatbot.verse_page_request),
+}
+
+# Routes whose handler is a generator of response body chunks
+STREAM_ROUTES = {
+    ('POST', '/ask-stream'): (ask_stream, partial(chatbot.string_field, name='question')),
+}
+
+STREAM_HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    # Stop proxies from buffering the stream
+    (b'x-accel-buffering', b'no')
+]
+
+# Pre-serialized payloads served straight from the event loop: (method, path) -> payload name
+STATIC_ROUTES = {
+    ('GET', '/categories'): 'categories',
+    ('GET', '/popular-questions'): 'popular_questions',
+}
+
+
+async def read_body(receive):
+    """Read the full request body"""
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+async def send_json(send, status, payload, headers=()):
+    """Send a JSON response serialized like Flask's jsonify"""
+    body = (chatbot.app.json.dumps(payload) + "\n").encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            *headers
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def etag_matches(if_none_match, etag):
+    """Check an If-None-Match header value against an unquoted ETag"""
+    if if_none_match.strip() == b'*':
+        return True
+    tags = (tag.strip().removeprefix(b'W/') for tag in if_none_match.split(b','))
+    return b'"' + etag.encode() + b'"' in tags
+
+
+async def send_static_payload(scope, send, name):
+    """Send a pre-serialized payload with ETag and Cache-Control, or 304 when the client has it"""
+    body, etag = chatbot.get_static_payloads()[name]
+    headers = [
+        (b'etag', b'"' + etag.encode() + b'"'),
+        (b'cache-control', f"public, max-age={chatbot.STATIC_PAYLOAD_MAX_AGE}".encode())
+    ]
+    if_none_match = dict(scope['headers']).get(b'if-none-match')
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        await send({'type': 'http.response.start', 'status': 304, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()), *headers]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def lifespan(receive, send):
+    """Handle server startup and shutdown"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            chatbot.start_qa_watcher()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            limiter.executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+
+    key = (scope.get('method'), scope.get('path')) if scope['type'] == 'http' else None
+    if key in STATIC_ROUTES:
+        # No per-request work, so no executor slot either
+        return await send_static_payload(scope, send, STATIC_ROUTES[key])
+
+    route = ROUTES.get(key) or STREAM_ROUTES.get(key)
+    if route is None:
+        return await flask_app(scope, receive, send)
+
+    handler, parse = route
+    try:
+        body = json.loads(await read_body(receive) or b'null')
+    except ValueError:
+        body = None
+    if not isinstance(body, dict):
+        return await send_json(send, 400, {'error': 'Request body must be a JSON object'})
+    try:
+        argument = parse(body)
+    except ValueError as e:
+        return await send_json(send, 400, {'error': str(e)})
+
+    if handler is ask and chatbot.ASK_DELAY_SECONDS > 0:
+        # Optional server-side delay without holding a thread or a queue slot
+        await asyncio.sleep(chatbot.ASK_DELAY_SECONDS)
+
+    # Shed load before doing any work when every thread is busy and the queue is full
+    if not limiter.admit():
+        logger.warning(f"Shedding {scope['path']} request, {limiter.pending} requests pending")
+        return await send_json(send, 503, {'error': 'Server is busy, please retry shortly'},
+                               headers=[(b'retry-after', str(ASYNC_RETRY_AFTER).encode())])
+
+    if key in STREAM_ROUTES:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': STREAM_HEADERS})
+        # aclosing stops the generator's thread at once if sending fails
+        async with aclosing(limiter.stream(handler(argument))) as chunks:
+            async for chunk in chunks:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    try:
+        status, payload, headers = await limiter.run(handler, argument)
+    except Exception as e:
+        logger.error(f"Error handling {scope['path']}: {e}")
+        return await send_json(send, 500, {'error': 'Internal server error'})
+    await send_json(send, status, payload, headers)
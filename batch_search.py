@@ -0,0 +1,192 @@
+# batch_search.py
+"""
+Offline batch verse search over QuranModelWrapper.
+
+Reads a JSONL file of queries (objects with a "query" or "question" field,
+or plain JSON strings) and writes one JSONL result per line, in input
+order, as chunks finish; a line that is not a valid query gets an
+{"line": n, "error": ...} result. Queries are split into chunks across a process
+pool; each worker loads the verse store and builds its search index once.
+
+    python batch_search.py queries.jsonl results.jsonl --workers 4 --top-k 5
+
+Re-running with --resume continues after the last complete result line.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from local_model_loader import QuranModelWrapper, default_model_path
+
+logger = logging.getLogger('BatchSearch')
+
+# Wrapper loaded once per worker process by init_worker
+worker_model = None
+
+
+def init_worker(model_path, engine):
+    """Load the model and build the search index in a worker process"""
+    global worker_model
+    worker_model = QuranModelWrapper(model_path, search_engine=engine)
+    if not worker_model.load():
+        raise RuntimeError(f"Failed to load model from {model_path}")
+
+
+def read_queries(path, offset=0):
+    """Yield (line number, record, query, error) for each input line from offset on
+
+    A line that cannot be read as a query still yields an entry, with an error
+    message instead of a query, so every input line gets exactly one result
+    line and --resume stays aligned with the input.
+    """
+    with open(path, encoding='utf-8') as f:
+        for number, line in islice(enumerate(f), offset, None):
+            line = line.strip()
+            if not line:
+                yield number, {}, None, "Empty line"
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield number, {}, None, f"Invalid JSON: {e}"
+                continue
+            if isinstance(record, str):
+                record = {"query": record}
+            if not isinstance(record, dict):
+                yield number, {}, None, "Expected a JSON object or string"
+                continue
+            query = record.get("query", record.get("question", ""))
+            if not isinstance(query, str):
+                yield number, record, None, "'query' must be a string"
+                continue
+            if not query.strip():
+                # An empty query is contained in every verse and would "match" the whole Quran
+                yield number, record, None, "Empty query"
+                continue
+            yield number, record, query, None
+
+
+def search_chunk(chunk, top_k):
+    """Search one chunk of (line number, record, query, error) in the worker, returning JSONL lines"""
+    batch = iter(worker_model.search_batch([query for number, record, query, error in chunk if error is None],
+                                           top_k=top_k))
+    lines = []
+    for number, record, query, error in chunk:
+        if error is not None:
+            output = {"line": number, "error": error}
+        else:
+            results = next(batch)
+            output = search_output(number, query, results)
+        if "id" in record:
+            output["id"] = record["id"]
+        lines.append(json.dumps(output, ensure_ascii=False) + "\n")
+    return lines
+
+
+def search_output(number, query, results):
+    """Result object for one searched query"""
+    if "error" in results:
+        return {"line": number, "query": query, "error": results["error"]}
+    matches = [results["primary_match"]] + results["other_matches"] if results["primary_match"] else []
+    return {
+        "line": number,
+        "query": query,
+        "total_matches": results["total_matches"],
+        "matches": [
+            {"reference": m["reference"], "verse": m["verse"], "score": round(m["score"], 4), "methods": m["methods"]}
+            for m in matches
+        ]
+    }
+
+
+def chunked(items, size):
+    """Split an iterable into lists of at most size items"""
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def completed_lines(path):
+    """Count complete result lines in path, dropping a partly written last line"""
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+        return data.count(b"\n", 0, end)
+
+
+def run(input_path, output_path, workers=1, top_k=5, offset=0, resume=False,
+        chunk_size=64, model_path=None, engine=None):
+    """Search every query in input_path and write the results to output_path; returns the count written"""
+    model_path = model_path or default_model_path()
+    if resume:
+        done = completed_lines(output_path)
+        logger.info(f"Resuming after {done} completed results")
+        offset += done
+    mode = 'a' if resume else 'w'
+
+    chunks = chunked(read_queries(input_path, offset), chunk_size)
+    written = 0
+    with open(output_path, mode, encoding='utf-8') as out:
+        if workers <= 1:
+            init_worker(model_path, engine)
+            for chunk in chunks:
+                out.writelines(search_chunk(chunk, top_k))
+                out.flush()
+                written += len(chunk)
+            return written
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(model_path, engine)) as executor:
+            # Keep a bounded number of chunks in flight and write them in submission order
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(search_chunk, chunk, top_k))
+                if len(pending) >= workers * 2:
+                    lines = pending.popleft().result()
+                    out.writelines(lines)
+                    out.flush()
+                    written += len(lines)
+            while pending:
+                lines = pending.popleft().result()
+                out.writelines(lines)
+                out.flush()
+                written += len(lines)
+
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search a JSONL file of queries against the Quran verse index")
+    parser.add_argument("input", help="JSONL file of queries")
+    parser.add_argument("output", help="JSONL file to write results to")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: CPU count)")
+    parser.add_argument("--top-k", type=int, default=5, help="matches per query (default: 5)")
+    parser.add_argument("--offset", type=int, default=0, help="skip this many input lines")
+    parser.add_argument("--resume", action="store_true",
+                        help="append to output, continuing after its last complete line (counted from --offset)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="queries per worker task (default: 64)")
+    parser.add_argument("--model", help="verse store or pickle to load (default: bundled model)")
+    parser.add_argument("--engine", help="search engine name (default: QURAN_SEARCH_ENGINE or legacy)")
+    args = parser.parse_args(argv)
+
+    written = run(args.input, args.output, workers=args.workers, top_k=args.top_k, offset=args.offset,
+                  resume=args.resume, chunk_size=max(args.chunk_size, 1), model_path=args.model, engine=args.engine)
+    logger.info(f"Wrote {written} results to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# benchmarks/bench_english_similarity.py
+"""
+Micro-benchmark for the English path of advanced_similarity_score.
+Compares rebuilding the stopword set and PorterStemmer on every call (the
+previous behaviour) with the module-level cached resources, and puts both
+next to the Urdu path for reference. Answering questions does not call
+advanced_similarity_score (QAIndex matches the Urdu QA data), so this only
+measures the helper itself.
+
+Run from the repository root:
+    python benchmarks/bench_english_similarity.py
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from nltk.corpus import stopwords
+from nltk.stem import PorterStemmer
+from nltk.tokenize import word_tokenize
+
+import app
+from text_utils import preprocess_text, combined_similarity
+
+ENGLISH_QUERIES = [
+    "How many chapters are there in the Quran?",
+    "Which prophet is mentioned the most in the Quran",
+    "What is the longest surah",
+    "Where is the first prostration in the Quran?",
+    "How many times is Prophet Moses mentioned",
+    "thanks a lot for explaining the revelation"
+]
+
+ENGLISH_REFERENCES = [
+    "The Quran consists of 114 chapters called surahs",
+    "Prophet Moses is mentioned more than any other prophet",
+    "Surah Al-Baqarah is the longest chapter of the Quran",
+    "The first prostration is in Surah Al-Araf verse 206",
+    "The Quran was revealed over a period of 23 years",
+    "The Quran is divided into 30 parts",
+    "Surah Al-Kawthar is the shortest chapter",
+    "Prophet Jesus is mentioned 25 times by name"
+]
+
+URDU_QUERIES = ["قرآن میں کتنی سورتیں ہیں", "سب سے طویل سورۃ کون سی ہے", "قرآن کس زبان میں نازل ہوا"]
+
+
+def uncached_english_score(query, reference):
+    """advanced_similarity_score as it was before the English resources were cached"""
+    query_processed = preprocess_text(query, False)
+    reference_processed = preprocess_text(reference, False)
+    query_tokens = word_tokenize(query_processed)
+    reference_tokens = word_tokenize(reference_processed)
+    stop_words = set(stopwords.words('english'))
+    query_tokens = [w for w in query_tokens if w not in stop_words]
+    reference_tokens = [w for w in reference_tokens if w not in stop_words]
+    stemmer = PorterStemmer()
+    query_tokens = [stemmer.stem(w) for w in query_tokens]
+    reference_tokens = [stemmer.stem(w) for w in reference_tokens]
+    return combined_similarity(query_processed, query_tokens, reference_processed, reference_tokens)
+
+
+def time_calls(label, score, pairs, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query, reference in pairs:
+            score(query, reference)
+    elapsed = time.perf_counter() - start
+    calls = rounds * len(pairs)
+    print(f"{label:<24} {calls:>7} calls  {elapsed * 1e6 / calls:9.1f} us/call")
+    return elapsed / calls
+
+
+def main(rounds=50):
+    english_pairs = [(q, r) for q in ENGLISH_QUERIES for r in ENGLISH_REFERENCES]
+    urdu_references = [q["question"] for q in app.load_qa_data().get("questions", [])]
+    urdu_pairs = [(q, r) for q in URDU_QUERIES for r in urdu_references]
+
+    try:
+        # Results must not change, only the cost
+        for query, reference in english_pairs:
+            assert abs(uncached_english_score(query, reference) -
+                       app.advanced_similarity_score(query, reference, is_urdu=False)) < 1e-12
+    except LookupError as e:
+        print(f"NLTK data missing, download 'stopwords' and 'punkt' first: {e}")
+        return 1
+
+    uncached = time_calls("english (uncached)", uncached_english_score, english_pairs, rounds)
+    cached = time_calls("english (cached)", lambda q, r: app.advanced_similarity_score(q, r, is_urdu=False),
+                        english_pairs, rounds)
+    urdu = time_calls("urdu", app.advanced_similarity_score, urdu_pairs, rounds)
+
+    print(f"\nCached English path is {uncached / cached:.1f}x faster, "
+          f"{cached / urdu:.2f}x the cost of the Urdu path")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+# benchmarks/bench_suite.py
+"""
+Benchmark suite for the matching and search hot paths.
+
+Times advanced_similarity_score, detect_specific_questions,
+find_matching_question, QuranModelWrapper.search (short, long, Urdu,
+English and no-hit queries per engine), load_qa_data and model loading.
+find_matching_question is also timed against synthetic QA sets grown
+from qa_data.json (35 up to 10k questions) to show how it scales.
+Query corpora and synthetic data are fixed, so runs are comparable.
+
+Results are written as JSON; pass an earlier file to --compare to print
+the change per benchmark.
+
+    python benchmarks/bench_suite.py --output before.json
+    python benchmarks/bench_suite.py --output after.json --compare before.json
+    python benchmarks/bench_suite.py --quick
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import app
+from local_model_loader import QuranModelWrapper, default_model_path
+from qa_index import QAIndex
+from search_engines import SEARCH_ENGINES
+
+EXTRA_QUERIES = [
+    "السلام علیکم", "شکریہ", "اللہ حافظ", "مدد",
+    "قرآن میں سب سے زیادہ ذکر کس نبی کا ہے", "آیت الکرسی", "پہلا شہید",
+    "صبر کرنے والوں کے ساتھ", "نماز قائم کرو", "جنت کیا ہے",
+    "How many chapters are there in the Quran?", "xyzzy qwerty"
+]
+
+# Verse search queries by kind
+SEARCH_QUERIES = {
+    "short": ["صبر", "نماز", "رحم"],
+    "long": [
+        "اور نماز پڑھا کرو اور زکوٰة دیا کرو اور خدا کے آگے جھکنے والوں کے ساتھ جھکا کرو",
+        "جو غیب پر ایمان لاتے اور آداب کے ساتھ نماز پڑھتے اور جو کچھ ہم نے ان کو عطا فرمایا ہے اس میں سے خرچ کرتے ہیں"
+    ],
+    "urdu": ["صبر کرنے والوں کے ساتھ", "بڑا مہربان نہایت رحم والا", "قیامت کا دن"],
+    "english": ["mercy", "patience and prayer", "day of judgement"],
+    "no_hit": ["xyzzy qwerty", "0987654321"],
+    "reference": ["البقرة 255", "2:255", "سورۃ الکہف آیت 10"]
+}
+
+ENGLISH_PAIRS = [
+    ("How many chapters are there in the Quran?", "The Quran consists of 114 chapters called surahs"),
+    ("Which prophet is mentioned the most", "Prophet Moses is mentioned more than any other prophet"),
+    ("What is the longest surah", "Surah Al-Baqarah is the longest chapter of the Quran")
+]
+
+SCALING_SIZES = (35, 100, 1000, 10000)
+
+
+def corpus(qa_data):
+    """Every question and alternative phrasing in the QA data, plus fixed extra queries"""
+    queries = []
+    for question in qa_data.get("questions", []):
+        queries.append(question["question"])
+        queries.extend(question.get("alternative_phrasings", []))
+    return queries + EXTRA_QUERIES
+
+
+def measure(func, inputs, rounds, warmup=1):
+    """Time func on each input for several rounds, returning per-call statistics in microseconds"""
+    for _ in range(warmup):
+        for item in inputs:
+            func(item)
+
+    timings = []
+    for _ in range(rounds):
+        for item in inputs:
+            start = time.perf_counter()
+            func(item)
+            timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    return {
+        "calls": len(timings),
+        "mean_us": statistics.fmean(timings) * 1e6,
+        "median_us": statistics.median(timings) * 1e6,
+        "p95_us": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1e6,
+        "min_us": timings[0] * 1e6,
+        "total_s": sum(timings)
+    }
+
+
+def synthetic_qa_data(qa_data, size, seed=0):
+    """Grow the QA data to size questions by recombining words of the real questions"""
+    rng = random.Random(seed)
+    base = qa_data.get("questions", [])
+    vocabulary = sorted({word for q in base for text in [q["question"], *q.get("alternative_phrasings", [])]
+                         for word in text.split()})
+
+    def mutate(text):
+        tokens = text.split()
+        # Swap a couple of words so every synthetic question is distinct
+        for _ in range(2):
+            tokens[rng.randrange(len(tokens))] = rng.choice(vocabulary)
+        return " ".join(tokens)
+
+    questions = [dict(q) for q in base[:size]]
+    while len(questions) < size:
+        template = base[rng.randrange(len(base))]
+        questions.append({
+            "id": f"synthetic_{len(questions)}",
+            "question": mutate(template["question"]),
+            "alternative_phrasings": [mutate(alt) for alt in template.get("alternative_phrasings", [])],
+            "answer": template["answer"],
+            "keywords": rng.sample(vocabulary, min(3, len(vocabulary))),
+            "category": template.get("category")
+        })
+    return dict(qa_data, questions=questions)
+
+
+def bench_loading(results, rounds):
+    qa_times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        app.load_qa_data(force_reload=True)
+        qa_times.append(time.perf_counter() - start)
+    results["load_qa_data"] = {"calls": rounds, "mean_us": statistics.fmean(qa_times) * 1e6,
+                               "min_us": min(qa_times) * 1e6}
+
+    model_path = default_model_path()
+    load_times = []
+    for _ in range(rounds):
+        wrapper = QuranModelWrapper(model_path)
+        start = time.perf_counter()
+        wrapper.load()
+        load_times.append(time.perf_counter() - start)
+    results["model_load"] = {"calls": rounds, "mean_us": statistics.fmean(load_times) * 1e6,
+                             "min_us": min(load_times) * 1e6, "model_path": str(model_path)}
+    return wrapper
+
+
+def bench_matching(results, qa_data, queries, rounds):
+    references = [q["question"] for q in qa_data.get("questions", [])]
+    urdu_pairs = [(q, r) for q in queries[:10] for r in references]
+    results["advanced_similarity_score/urdu"] = measure(
+        lambda pair: app.advanced_similarity_score(*pair), urdu_pairs, rounds)
+    try:
+        results["advanced_similarity_score/english"] = measure(
+            lambda pair: app.advanced_similarity_score(*pair, is_urdu=False), ENGLISH_PAIRS, rounds)
+    except LookupError:
+        results["advanced_similarity_score/english"] = {"skipped": "NLTK stopwords/punkt data missing"}
+
+    results["detect_specific_questions"] = measure(app.detect_specific_questions, queries, rounds)
+    snapshot = app.load_qa_snapshot()
+    results["find_matching_question"] = measure(lambda q: app.find_matching_question(q, snapshot), queries, rounds)
+
+
+def bench_search(results, wrapper, rounds):
+    for engine in SEARCH_ENGINES:
+        if wrapper.get_search_engine(engine).name != engine:
+            # The wrapper falls back to legacy when an engine's dependencies are missing
+            results[f"search/{engine}"] = {"skipped": "engine unavailable"}
+            continue
+        for kind, queries in SEARCH_QUERIES.items():
+            results[f"search/{engine}/{kind}"] = measure(
+                lambda q: wrapper.search(q, top_k=5, engine=engine), queries, rounds)
+
+
+def bench_scaling(results, qa_data, queries, sizes, rounds):
+    # A fixed sample keeps the largest sizes affordable
+    sample = queries[::max(1, len(queries) // 20)]
+    for size in sizes:
+        data = synthetic_qa_data(qa_data, size)
+        start = time.perf_counter()
+        index = QAIndex(data, app.CATEGORY_KEYWORDS)
+        build = time.perf_counter() - start
+        stats = measure(index.find, sample, rounds)
+        stats["index_build_s"] = build
+        results[f"find_matching_question/scaling/{size}"] = stats
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print the mean time of each benchmark relative to a baseline run"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    print(f"\n{'benchmark':<48} {'before us':>12} {'after us':>12} {'change':>8}")
+    for name, stats in results.items():
+        before = baseline.get(name, {}).get("mean_us")
+        after = stats.get("mean_us")
+        if before is None or after is None:
+            continue
+        print(f"{name:<48} {before:12.1f} {after:12.1f} {after / before:7.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the matching and search hot paths")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--rounds", type=int, default=5, help="timed rounds per benchmark (default: 5)")
+    parser.add_argument("--quick", action="store_true", help="one round and QA sets up to 1000 questions")
+    args = parser.parse_args(argv)
+
+    rounds = 1 if args.quick else args.rounds
+    sizes = [size for size in SCALING_SIZES if not args.quick or size <= 1000]
+
+    results = {}
+    wrapper = bench_loading(results, min(rounds, 3))
+    qa_data = app.load_qa_data()
+    queries = corpus(qa_data)
+    bench_matching(results, qa_data, queries, rounds)
+    bench_search(results, wrapper, max(1, rounds // 2))
+    bench_scaling(results, qa_data, queries, sizes, max(1, rounds // 2))
+
+    for name, stats in results.items():
+        if "skipped" in stats:
+            print(f"{name:<48} skipped: {stats['skipped']}")
+        else:
+            print(f"{name:<48} {stats['calls']:>6} calls {stats['mean_us']:12.1f} us/call")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "rounds": rounds,
+            "queries": len(queries)
+        },
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+# benchmarks/golden_answers.py
+"""
+Golden-answer regression harness for matching and search rewrites.
+
+`record` runs a fixed query corpus through the answering pipeline and saves,
+per query, the answer source, the matched QA question id and the top-k verse
+references, together with latencies. `compare` runs the same corpus again
+(optionally with another search engine) and reports what changed: source and
+id mismatches, overlap@k and Spearman rank correlation of the verse
+references, and latency before and after. Everything runs offline against
+qa_data.json and the bundled verse data.
+
+    python benchmarks/golden_answers.py record golden.json
+    python benchmarks/golden_answers.py compare golden.json --engine tfidf
+
+compare exits with status 1 when any source or question id changed, or when
+the mean overlap@k drops below --min-overlap.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import app
+from bench_suite import SEARCH_QUERIES, corpus
+from text_utils import preprocess_text
+
+
+def answer_record(query, snapshot, top_k):
+    """Resolve one query without the response cache and describe the answer"""
+    key = preprocess_text(query)
+    start = time.perf_counter()
+    resolved = app.resolve_question(key, snapshot)
+    elapsed = time.perf_counter() - start
+
+    match = app.find_matching_question(key, snapshot)
+    record = {
+        "source": app.answer_source(resolved),
+        "question_id": match.get("id") if match else None,
+        "latency_s": elapsed
+    }
+    if record["source"] == "search_model":
+        record.update(verse_record(key, top_k))
+    return record
+
+
+def verse_record(query, top_k):
+    """Top-k verse references for a query and the time the search took"""
+    start = time.perf_counter()
+    results = app.model_wrapper.search(query, top_k=top_k)
+    elapsed = time.perf_counter() - start
+    matches = [results["primary_match"]] + results["other_matches"] if results.get("primary_match") else []
+    return {
+        "references": [match["reference"] for match in matches],
+        "total_matches": results.get("total_matches", 0),
+        "search_latency_s": elapsed
+    }
+
+
+def run_corpus(engine, top_k):
+    """Record answers for the QA corpus and verse references for the search corpus"""
+    snapshot = app.load_qa_snapshot()
+    if engine:
+        app.model_wrapper.search_engine_name = engine
+    app.model_wrapper.ensure_loaded()
+
+    answers = {query: answer_record(query, snapshot, top_k) for query in dict.fromkeys(corpus(snapshot.data))}
+    searches = {
+        query: verse_record(query, top_k)
+        for queries in SEARCH_QUERIES.values() for query in queries
+    }
+    return {
+        "engine": app.model_wrapper.get_search_engine().name,
+        "top_k": top_k,
+        "answers": answers,
+        "searches": searches
+    }
+
+
+def overlap_at_k(expected, actual, k):
+    """Share of the expected top-k references that are also in the actual top-k"""
+    expected = expected[:k]
+    if not expected:
+        return 1.0 if not actual[:k] else 0.0
+    return len(set(expected) & set(actual[:k])) / len(expected)
+
+
+def spearman(expected, actual):
+    """Spearman rank correlation over the references both rankings contain, or None below two"""
+    shared = [ref for ref in expected if ref in actual]
+    n = len(shared)
+    if n < 2:
+        return None
+    # Rank the shared references within each list
+    expected_rank = {ref: rank for rank, ref in enumerate(shared)}
+    actual_rank = {ref: rank for rank, ref in enumerate(ref for ref in actual if ref in expected_rank)}
+    d_squared = sum((expected_rank[ref] - actual_rank[ref]) ** 2 for ref in shared)
+    return 1 - (6 * d_squared) / (n * (n * n - 1))
+
+
+def latency_summary(values):
+    if not values:
+        return {}
+    values = sorted(values)
+    return {
+        "median_ms": statistics.median(values) * 1000,
+        "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))] * 1000,
+        "total_s": sum(values)
+    }
+
+
+def compare(golden, current, min_overlap):
+    """Print the differences between a golden run and the current one; return the exit status"""
+    top_k = golden["top_k"]
+    print(f"Golden engine: {golden['engine']}, current engine: {current['engine']}, k={top_k}\n")
+
+    changed = []
+    for query, expected in golden["answers"].items():
+        actual = current["answers"].get(query)
+        if actual is None:
+            continue
+        if (expected["source"], expected["question_id"]) != (actual["source"], actual["question_id"]):
+            changed.append((query, expected, actual))
+    for query, expected, actual in changed:
+        print(f"CHANGED {query!r}: {expected['source']}/{expected['question_id']} -> "
+              f"{actual['source']}/{actual['question_id']}")
+
+    # Ranking drift over every query that went to verse search in both runs
+    pairs = [
+        (expected["references"], current_entry["references"])
+        for section in ("answers", "searches")
+        for query, expected in golden[section].items()
+        if "references" in expected and "references" in (current_entry := current[section].get(query) or {})
+    ]
+    overlaps = [overlap_at_k(expected, actual, top_k) for expected, actual in pairs]
+    correlations = [rho for rho in (spearman(expected, actual) for expected, actual in pairs) if rho is not None]
+    mean_overlap = statistics.fmean(overlaps) if overlaps else 1.0
+
+    print(f"\nAnswers compared:        {len(golden['answers'])}, changed source or id: {len(changed)}")
+    print(f"Verse rankings compared: {len(pairs)}")
+    print(f"Mean overlap@{top_k}:          {mean_overlap:.3f} (min {min(overlaps, default=1.0):.3f})")
+    if correlations:
+        print(f"Mean Spearman rho:       {statistics.fmean(correlations):.3f} over {len(correlations)} rankings")
+
+    for label, section, field in (("answer", "answers", "latency_s"), ("search", "searches", "search_latency_s")):
+        before = latency_summary([entry[field] for entry in golden[section].values() if field in entry])
+        after = latency_summary([entry[field] for entry in current[section].values() if field in entry])
+        if before and after:
+            print(f"{label} latency median {before['median_ms']:.1f} -> {after['median_ms']:.1f} ms, "
+                  f"p95 {before['p95_ms']:.1f} -> {after['p95_ms']:.1f} ms")
+
+    return 1 if changed or mean_overlap < min_overlap else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record or check golden answers for the query corpus")
+    parser.add_argument("command", choices=["record", "compare"])
+    parser.add_argument("golden", help="golden answers JSON file")
+    parser.add_argument("--engine", help="search engine to run (default: QURAN_SEARCH_ENGINE or legacy)")
+    parser.add_argument("--top-k", type=int, default=10, help="verse references recorded per query (default: 10)")
+    parser.add_argument("--min-overlap", type=float, default=1.0,
+                        help="lowest acceptable mean overlap@k for compare (default: 1.0)")
+    parser.add_argument("--output", help="also save the current run to this file when comparing")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        run = run_corpus(args.engine, args.top_k)
+        with open(args.golden, "w", encoding="utf-8") as f:
+            json.dump(run, f, ensure_ascii=False, indent=2)
+        print(f"Recorded {len(run['answers'])} answers and {len(run['searches'])} searches to {args.golden}")
+        return 0
+
+    with open(args.golden, encoding="utf-8") as f:
+        golden = json.load(f)
+    current = run_corpus(args.engine, golden["top_k"])
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+    return compare(golden, current, args.min_overlap)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
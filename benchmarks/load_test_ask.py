@@ -0,0 +1,93 @@
+# benchmarks/load_test_ask.py
+"""
+Load test for the /ask endpoint.
+
+By default the app runs in-process and requests are sent one after another,
+which is what a single gunicorn sync worker sees. Use --delay to reproduce
+the old fixed server-side sleep, and --url to load a running server with
+several concurrent clients instead.
+
+    python benchmarks/load_test_ask.py --delay 0.2      # before
+    python benchmarks/load_test_ask.py                  # after
+    gunicorn -w 1 app:app & python benchmarks/load_test_ask.py --url http://127.0.0.1:8000 --concurrency 8
+"""
+import argparse
+import json
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def load_questions():
+    """Questions from the QA database plus a few greetings and verse searches"""
+    with open(ROOT / "qa_data.json", encoding="utf-8") as f:
+        qa_data = json.load(f)
+    questions = [q["question"] for q in qa_data.get("questions", [])]
+    return questions + ["السلام علیکم", "شکریہ", "صبر کرنے والوں کے ساتھ", "نماز قائم کرو"]
+
+
+def run_in_process(questions, requests_count, delay, use_cache):
+    import app
+
+    app.ASK_DELAY_SECONDS = delay
+    if not use_cache:
+        app.response_cache.maxsize = 0
+    client = app.app.test_client()
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(requests_count):
+        sent = time.perf_counter()
+        response = client.post('/ask', json={'question': questions[i % len(questions)]})
+        assert response.status_code == 200
+        latencies.append(time.perf_counter() - sent)
+    return time.perf_counter() - start, latencies
+
+
+def run_http(url, questions, requests_count, concurrency):
+    def send(i):
+        body = json.dumps({'question': questions[i % len(questions)]}).encode('utf-8')
+        req = urllib.request.Request(url.rstrip('/') + '/ask', data=body,
+                                     headers={'Content-Type': 'application/json'})
+        sent = time.perf_counter()
+        with urllib.request.urlopen(req) as response:
+            response.read()
+        return time.perf_counter() - sent
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(send, range(requests_count)))
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--delay', type=float, default=0.0, help='server-side delay for in-process runs')
+    parser.add_argument('--no-cache', action='store_true', help='disable the /ask response cache (in-process)')
+    parser.add_argument('--url', help='base URL of a running server')
+    parser.add_argument('--concurrency', type=int, default=4, help='concurrent clients for --url')
+    args = parser.parse_args()
+
+    questions = load_questions()
+    if args.url:
+        elapsed, latencies = run_http(args.url, questions, args.requests, args.concurrency)
+        mode = f"{args.url} with {args.concurrency} clients"
+    else:
+        elapsed, latencies = run_in_process(questions, args.requests, args.delay, not args.no_cache)
+        mode = f"in-process, delay={args.delay}s, cache={'off' if args.no_cache else 'on'}"
+
+    latencies.sort()
+    print(f"{mode}: {len(latencies)} requests in {elapsed:.2f}s "
+          f"= {len(latencies) / elapsed:.1f} req/s, "
+          f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+          f"p99 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings for the chatbot.
+
+preload_app imports app.py in the master, which (in the default eager
+loading mode) loads the QA data and the verse model and builds their
+indexes once. Forked workers then share those pages copy-on-write. Each
+worker starts its own qa_data.json watcher after the fork.
+
+    gunicorn app:app
+"""
+import gc
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 2))
+preload_app = True
+
+
+def when_ready(server):
+    """Freeze the warmed-up heap before workers are forked"""
+    # Keeps the garbage collector from touching (and so copying) the shared objects in each worker
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Start the QA data watcher in each worker, since threads are not inherited across fork"""
+    import app
+
+    app.start_qa_watcher()
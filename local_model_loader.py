@@ -8,9 +8,13 @@ import os
 import logging
 from pathlib import Path
 import re
-import difflib
 import json
 import random
+import threading
+
+from search_engines import SEARCH_ENGINES
+from text_utils import normalize_urdu
+from verse_store import VerseStore, is_verse_store
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('LocalModelLoader')
@@ -35,29 +39,170 @@ SURAH_NAMES = {
     111: "اللهب", 112: "الإخلاص", 113: "الفلق", 114: "الناس"
 }
 
+def surah_name_key(name):
+    """Normalized, space-free form of a Surah name used to look it up"""
+    return "".join(normalize_urdu(name).lower().split())
+
+def surah_numbers():
+    """Map Surah name keys to numbers, also without the leading "ال" that users often leave out"""
+    numbers = {surah_name_key(name): number for number, name in SURAH_NAMES.items()}
+    for key, number in list(numbers.items()):
+        if key.startswith("ال") and len(key) > 3:
+            numbers.setdefault(key[2:], number)
+    return numbers
+
+SURAH_NUMBERS = surah_numbers()
+
+# "2:255", "البقرة 255", "سورۃ البقرہ آیت 255", "surah 2 ayah 255" once normalized
+# (normalization turns ":" and "،" into spaces and folds ة/ۃ to ہ, so آية reads آیہ)
+REFERENCE_PATTERN = re.compile(
+    r'(?:(?:سورہ|سورت|surah|sura)\s*)?'
+    r'(?:(?P<number>\d{1,3})[\s,./-]+|(?P<name>\D+?)[\s,./-]*)'
+    r'(?:(?:آیت|آیہ|ayah|ayat|aya|verse)\s*(?:نمبر\s*)?)?'
+    r'(?P<ayah>\d{1,3})'
+)
+
+def parse_reference(query):
+    """Return (surah, ayah) if the query is a verse reference rather than text, else None"""
+    if not isinstance(query, str):
+        return None
+    match = REFERENCE_PATTERN.fullmatch(" ".join(normalize_urdu(query).lower().split()))
+    if not match:
+        return None
+    if match.group('number'):
+        surah = int(match.group('number'))
+    else:
+        surah = SURAH_NUMBERS.get("".join(match.group('name').split()))
+    if surah is None or not 1 <= surah <= len(SURAH_NAMES):
+        return None
+    return surah, int(match.group('ayah'))
+
+# Bundled pickled DataFrame, and the verse store generated from it at build or deploy time
+VERSE_STORE_PATH = Path("./models/quran_verses.bin")
+PICKLE_MODEL_PATH = Path("./models/processed_quran.pkl")
+
+def default_model_path():
+    """Return the verse store if it was generated from the current pickle, otherwise the pickle"""
+    if not VERSE_STORE_PATH.exists():
+        return PICKLE_MODEL_PATH
+    if PICKLE_MODEL_PATH.exists() and PICKLE_MODEL_PATH.stat().st_mtime_ns > VERSE_STORE_PATH.stat().st_mtime_ns:
+        # A store older than the pickle may hold outdated translations
+        logger.warning(f"{VERSE_STORE_PATH} is older than {PICKLE_MODEL_PATH}, using the pickle. "
+                       f"Regenerate it with: python verse_store.py {PICKLE_MODEL_PATH} {VERSE_STORE_PATH}")
+        return PICKLE_MODEL_PATH
+    return VERSE_STORE_PATH
+
 class QuranModelWrapper:
-    def __init__(self, model_path="./models/processed_quran.pkl"):
+    def __init__(self, model_path="./models/processed_quran.pkl", search_engine=None):
         self.model_path = Path(model_path)
         self.engine = None
+        self.model_type = "unknown"
         self.loaded = False
+        # Set after a failed load so lazy callers don't retry on every request
+        self.load_failed = False
+        # Serializes loading so concurrent first requests share a single load
+        self.load_lock = threading.RLock()
+        self.verses = []
+        # (surah, ayah) -> verse position
+        self.reference_index = {}
+        # Retrieval engine used by search(), selectable via QURAN_SEARCH_ENGINE
+        self.search_engine_name = search_engine or os.environ.get("QURAN_SEARCH_ENGINE", "legacy")
+        if self.search_engine_name not in SEARCH_ENGINES:
+            logger.warning(f"Unknown search engine '{self.search_engine_name}', using legacy")
+            self.search_engine_name = "legacy"
+        self.search_engines = {}
 
     def load(self):
-        if not self.model_path.exists():
-            logger.error(f"Model not found: {self.model_path}")
-            return False
-        try:
-            with open(self.model_path, 'rb') as f:
-                self.engine = pickle.load(f)
-            self.loaded = True
+        """Load (or reload) the model and build its search index"""
+        with self.load_lock:
+            if not self.model_path.exists():
+                logger.error(f"Model not found: {self.model_path}")
+                self.load_failed = True
+                return False
+            try:
+                if is_verse_store(self.model_path):
+                    # Memory-mapped store: read without unpickling (and so importing) pandas
+                    self.engine = VerseStore(self.model_path)
+                    self.model_type = "verse_store"
+                else:
+                    with open(self.model_path, 'rb') as f:
+                        self.engine = pickle.load(f)
+                    self.model_type = "dataframe"
+                self.build_index()
+                self.loaded = True
+                self.load_failed = False
+                logger.info(f"Loaded {self.model_type} model from {self.model_path}")
+                return True
+            except Exception as e:
+                logger.error(f"Error loading model: {e}")
+                self.load_failed = True
+                return False
+
+    def ensure_loaded(self):
+        """Load the model on first use; concurrent callers wait for that one load"""
+        if self.loaded:
             return True
-        except Exception as e:
-            logger.error(f"Error loading model: {e}")
-            return False
+        with self.load_lock:
+            # Another thread may have finished loading while we waited
+            if not self.loaded and not self.load_failed:
+                self.load()
+            return self.loaded
+
+    def build_index(self):
+        """Precompute normalized verse records and build the selected search engine"""
+        verses = []
+        reference_index = {}
+        for position, record in enumerate(self.engine.to_dict('records')):
+            verse_text = record.get('Translation', '')
+            normalized = self.normalize_text(verse_text)
+            # Keep one string where the forms are equal; Urdu has no case, so lower() never changes it
+            if normalized == verse_text:
+                normalized = verse_text
+            lower = normalized.lower()
+            if lower == normalized:
+                lower = normalized
+            surah = record.get('Surah', '?')
+            ayah = record.get('Ayah', '?')
+            verses.append({
+                "text": verse_text,
+                # Queries are normalized too, so exact and contains checks see the same letter forms
+                "lower": lower,
+                "normalized": normalized,
+                "surah": surah,
+                "ayah": ayah,
+                "reference": self.get_reference(surah, ayah)
+            })
+            try:
+                reference_index[(int(surah), int(ayah))] = position
+            except (TypeError, ValueError):
+                pass
+
+        self.verses = verses
+        self.reference_index = reference_index
+        self.search_engines = {}
+        self.get_search_engine(self.search_engine_name)
+
+    def get_search_engine(self, name=None):
+        """Return the named search engine, building it on first use"""
+        name = name or self.search_engine_name
+        if name in self.search_engines:
+            return self.search_engines[name]
+        with self.load_lock:
+            if name in self.search_engines:
+                return self.search_engines[name]
+            try:
+                self.search_engines[name] = SEARCH_ENGINES[name](self.verses)
+            except ImportError as e:
+                logger.error(f"Search engine '{name}' unavailable ({e}), using legacy")
+                if name == "legacy":
+                    raise
+                self.search_engines[name] = self.get_search_engine("legacy")
+        return self.search_engines[name]
 
     def normalize_text(self, text):
         if not isinstance(text, str):
             text = str(text)
-        return re.sub(r'[۔،؟!؛:\(\)]', ' ', text).strip()
+        return normalize_urdu(text).strip()
 
     def get_reference(self, surah, ayah):
         """Generate formatted reference with Surah name and Ayah number only."""
@@ -71,59 +216,97 @@ class QuranModelWrapper:
         except Exception as e:
             # Fallback in case of error
             logger.error(f"Error generating reference: {e}")
-            return f"{surah_name} ، آیت {ayah}"
+            return f"Surah {surah} ، آیت {ayah}"
+
+    def reference_matches(self, query, top_k=None):
+        """Return the match for a query naming a verse by reference ("2:255"), or None for any other query"""
+        reference = parse_reference(query)
+        position = self.reference_index.get(reference) if reference else None
+        if position is None:
+            return None
+        return [(1.0, position, ["reference_match"])][:top_k]
 
         
-    def search(self, query):
-        if not self.loaded:
-            if not self.load():
-                return {"error": "Model not loaded"}
+    def search(self, query, top_k=None, min_score=0, engine=None):
+        """Search verses, returning the top_k best matches scoring at least min_score"""
+        if not self.ensure_loaded():
+            return {"error": "Model not loaded"}
+
+        # A typed reference is a dictionary lookup, not a scan
+        best = self.reference_matches(query, top_k)
+        if best is not None:
+            return self.format_results(best, 1)
 
         query = self.normalize_text(query)
-        query_words = query.split()
+        best, total_matches = self.get_search_engine(engine).search(query, top_k=top_k, min_score=min_score)
+        return self.format_results(best, total_matches)
 
-        results = []
+    def search_batch(self, queries, top_k=None, min_score=0, engine=None):
+        """Search several queries at once, returning one search() result per query in input order"""
+        if not self.ensure_loaded():
+            return [{"error": "Model not loaded"} for _ in queries]
 
-        for record in self.engine.to_dict('records'):
-            verse_text = record.get('Translation', '')
-            normalized_verse = self.normalize_text(verse_text)
-            surah = record.get('Surah', '?')
-            ayah = record.get('Ayah', '?')
+        normalized = [self.normalize_text(query) for query in queries]
+        results = {}
+        for query in dict.fromkeys(normalized):
+            best = self.reference_matches(query, top_k)
+            if best is not None:
+                results[query] = self.format_results(best, 1)
 
-            score = 0
-            methods = []
-
-            if query.lower() == verse_text.lower():
-                score = 1.0
-                methods.append("exact_match")
-            elif query.lower() in verse_text.lower():
-                score = 0.9
-                methods.append("contains_match")
-            else:
-                matching_words = sum(1 for word in query_words if word in normalized_verse)
-                if matching_words > 0:
-                    score = max(score, matching_words / len(query_words) * 0.8)
-                    methods.append("word_match")
-                fuzzy_score = difflib.SequenceMatcher(None, query, normalized_verse).ratio()
-                if fuzzy_score > 0.5:
-                    score = max(score, fuzzy_score * 0.7)
-                    methods.append("fuzzy_match")
-
-            if score > 0:
-                results.append({
-                    "verse": verse_text,
-                    "reference": self.get_reference(surah, ayah),
-                    "score": score,
-                    "methods": methods
-                })
-
-        # Sort all results (no top_k limitation now)
-        results = sorted(results, key=lambda x: x['score'], reverse=True)
+        # Each distinct normalized query that is not a reference is scored once
+        unique = [query for query in dict.fromkeys(normalized) if query not in results]
+        search_engine = self.get_search_engine(engine)
+        if hasattr(search_engine, "search_batch"):
+            batch = search_engine.search_batch(unique, top_k=top_k, min_score=min_score)
+        else:
+            batch = [search_engine.search(query, top_k=top_k, min_score=min_score) for query in unique]
+
+        results.update((query, self.format_results(best, total_matches)) for query, (best, total_matches) in zip(unique, batch))
+        return [results[query] for query in normalized]
+
+    def format_results(self, best, total_matches):
+        """Build the search() result dict from an engine's best matches"""
+        # Only the selected matches are turned into result dicts
+        results = [self.format_match(score, position, methods) for score, position, methods in best]
 
         return {
             "primary_match": results[0] if results else None,
             "other_matches": results[1:] if len(results) > 1 else [],
-            "total_matches": len(results)
+            "total_matches": total_matches
+        }
+
+    def iter_search(self, query, top_k=None, min_score=0, stats=None, engine=None):
+        """Yield result dicts best first as the engine finds them; stats receives total_matches"""
+        if not self.ensure_loaded():
+            return
+
+        matches = self.reference_matches(query, top_k)
+        if matches is not None:
+            if stats is not None:
+                stats["total_matches"] = 1
+            yield from (self.format_match(score, position, methods) for score, position, methods in matches)
+            return
+
+        query = self.normalize_text(query)
+        search_engine = self.get_search_engine(engine)
+        if hasattr(search_engine, "iter_search"):
+            matches = search_engine.iter_search(query, top_k=top_k, min_score=min_score, stats=stats)
+        else:
+            matches, total_matches = search_engine.search(query, top_k=top_k, min_score=min_score)
+            if stats is not None:
+                stats["total_matches"] = total_matches
+
+        for score, position, methods in matches:
+            yield self.format_match(score, position, methods)
+
+    def format_match(self, score, position, methods):
+        """Build the result dict for a scored verse"""
+        verse = self.verses[position]
+        return {
+            "verse": verse["text"],
+            "reference": verse["reference"],
+            "score": score,
+            "methods": methods
         }
             
     
@@ -188,7 +371,7 @@ class QuranModelWrapper:
 # Simple test function
 def test_model():
     """Test the model loading and searching"""
-    model_path = Path("./models/processed_quran.pkl")
+    model_path = default_model_path()
     
     if not model_path.exists():
         print(f"Model not found at {model_path}")
@@ -0,0 +1,171 @@
+# metrics.py
+"""
+Lightweight per-stage latency metrics for answering questions.
+
+Code marks stages with `with metrics.stage("name"):`. Durations go into
+Prometheus-style histograms, and also into the current request's trace
+(if one is active) so they can be sent back as a Server-Timing header.
+When ASK_METRICS=0, stage() and trace() return shared no-op context
+managers.
+
+Metrics are kept per process; with several gunicorn workers each worker
+reports its own /metrics.
+"""
+import contextvars
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+# Upper bounds of the histogram buckets in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Trace of the request being handled in the current thread or task
+current_trace = contextvars.ContextVar('current_trace', default=None)
+
+
+class Histogram:
+    """Bucket counts, sum and count of observations for each label value"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, label, value):
+        series = self.series.get(label)
+        if series is None:
+            # Bucket counts (the last is +Inf), sum, count
+            series = self.series[label] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self, name, label_name):
+        """Yield Prometheus text lines with cumulative buckets"""
+        for label, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield f'{name}_bucket{{{label_name}="{label}",le="{le}"}} {cumulative}'
+            yield f'{name}_sum{{{label_name}="{label}"}} {total}'
+            yield f'{name}_count{{{label_name}="{label}"}} {count}'
+
+
+class Stage:
+    """Times one stage into the stage histogram and the current trace"""
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.metrics.observe_stage(self.name, elapsed)
+        trace = current_trace.get()
+        if trace is not None:
+            trace.stages[self.name] = trace.stages.get(self.name, 0.0) + elapsed
+        return False
+
+
+class Trace:
+    """Collects the stage durations and answer source of one request"""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.stages = {}
+        self.source = None
+
+    def __enter__(self):
+        self.token = current_trace.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        current_trace.reset(self.token)
+        self.stages['total'] = elapsed
+        self.metrics.observe_request(self.source or 'unknown', elapsed)
+        return False
+
+    def server_timing(self):
+        """Format the stage durations as a Server-Timing header value"""
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items())
+
+
+class NullTrace:
+    """Trace used when metrics are disabled"""
+    stages = {}
+    source = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def server_timing(self):
+        return ""
+
+
+NULL_STAGE = nullcontext()
+NULL_TRACE = NullTrace()
+
+
+class Metrics:
+    """Stage and request latency histograms with answer source labels"""
+
+    def __init__(self, enabled=True, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.stage_seconds = Histogram(buckets)
+        self.request_seconds = Histogram(buckets)
+
+    def stage(self, name):
+        """Context manager timing a named stage"""
+        if not self.enabled:
+            return NULL_STAGE
+        return Stage(self, name)
+
+    def trace(self):
+        """Context manager collecting the stages of one request"""
+        if not self.enabled:
+            return NULL_TRACE
+        return Trace(self)
+
+    def set_source(self, source):
+        """Record which source answered the current request"""
+        trace = current_trace.get()
+        if trace is not None:
+            trace.source = source
+
+    def observe_stage(self, name, seconds):
+        with self.lock:
+            self.stage_seconds.observe(name, seconds)
+
+    def observe_request(self, source, seconds):
+        with self.lock:
+            self.request_seconds.observe(source, seconds)
+
+    def render(self, extra_lines=()):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP quran_ask_stage_seconds Time spent in each question answering stage",
+            "# TYPE quran_ask_stage_seconds histogram"
+        ]
+        with self.lock:
+            lines.extend(self.stage_seconds.render("quran_ask_stage_seconds", "stage"))
+            lines.append("# HELP quran_ask_request_seconds Time to answer a question by answer source")
+            lines.append("# TYPE quran_ask_request_seconds histogram")
+            lines.extend(self.request_seconds.render("quran_ask_request_seconds", "source"))
+        lines.extend(extra_lines)
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics(enabled=os.environ.get("ASK_METRICS", "1") != "0")
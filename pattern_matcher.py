@@ -0,0 +1,61 @@
+# pattern_matcher.py
+"""
+Aho-Corasick multi-pattern matcher used for intent and specific-question
+detection. All patterns are compiled into one automaton so every substring
+hit is found in a single pass over the input.
+"""
+
+
+class PatternMatcher:
+    """Find which of many substring patterns occur in a text"""
+
+    def __init__(self, patterns):
+        """Compile an iterable of (pattern, value) pairs; earlier pairs have priority"""
+        self.transitions = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+        self.pattern_count = 0
+
+        for priority, (pattern, value) in enumerate(patterns):
+            node = 0
+            for char in pattern:
+                next_node = self.transitions[node].get(char)
+                if next_node is None:
+                    next_node = len(self.transitions)
+                    self.transitions[node][char] = next_node
+                    self.transitions.append({})
+                    self.fail.append(0)
+                    self.outputs.append([])
+                node = next_node
+            self.outputs[node].append((priority, value))
+            self.pattern_count += 1
+
+        # Breadth-first pass to link each node to its longest proper suffix in the trie
+        queue = list(self.transitions[0].values())
+        for node in queue:
+            for char, child in self.transitions[node].items():
+                fallback = self.fail[node]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                link = self.transitions[fallback].get(char, 0)
+                self.fail[child] = link if link != child else 0
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+                queue.append(child)
+
+    def find_all(self, text):
+        """Return every (priority, value) whose pattern occurs in text, in priority order"""
+        # Empty patterns live on the root and match any text
+        hits = set(self.outputs[0])
+        node = 0
+        for char in text:
+            while node and char not in self.transitions[node]:
+                node = self.fail[node]
+            node = self.transitions[node].get(char, 0)
+            if self.outputs[node]:
+                hits.update(self.outputs[node])
+        return sorted(hits, key=lambda hit: hit[0])
+
+    def first(self, text):
+        """Return the value of the highest-priority pattern found in text, or None"""
+        hits = self.find_all(text)
+        return hits[0][1] if hits else None
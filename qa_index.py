@@ -0,0 +1,110 @@
+# qa_index.py
+"""
+Precomputed index over the QA database used by find_matching_question.
+Everything derived from the questions is prepared once when the data is
+loaded, so matching a request only has to process the user's input.
+"""
+from metrics import metrics
+from pattern_matcher import PatternMatcher
+from text_utils import normalize_urdu, preprocess_text, tokenize_urdu, combined_similarity
+
+
+class QAIndex:
+    """Normalized texts, token sets and keyword weights for a QA data set"""
+
+    def __init__(self, qa_data, category_keywords):
+        self.qa_data = qa_data
+        self.questions = qa_data.get("questions", [])
+
+        # (question, processed text, token set) for each question and then its phrasings
+        self.phrasings = []
+        # Same entries for the main question texts only, used by fuzzy matching
+        self.question_texts = []
+        # (question, [(keyword, weight)], category) in question order
+        self.keyword_entries = []
+
+        keywords = set()
+        for question in self.questions:
+            entry = self.make_entry(question, question.get("question", ""))
+            self.phrasings.append(entry)
+            self.question_texts.append(entry)
+            for alt in question.get("alternative_phrasings", []):
+                self.phrasings.append(self.make_entry(question, alt))
+
+            # Weight longer keywords more
+            weighted = [(normalize_urdu(keyword).lower(), (len(keyword) ** 1.5) * 0.1)
+                        for keyword in question.get("keywords", [])]
+            keywords.update(keyword for keyword, weight in weighted)
+            category = question.get("category") if question.get("category") in category_keywords else None
+            self.keyword_entries.append((question, weighted, category))
+
+        self.keyword_matcher = PatternMatcher((keyword, keyword) for keyword in sorted(keywords))
+        self.category_matcher = PatternMatcher(
+            (normalize_urdu(keyword).lower(), category)
+            for category, cat_keywords in category_keywords.items() for keyword in cat_keywords
+        )
+
+    @staticmethod
+    def make_entry(question, text):
+        processed = preprocess_text(text)
+        return question, processed, frozenset(tokenize_urdu(processed))
+
+    def find(self, user_input):
+        """Find the best matching question for the user's input, or None"""
+        processed_input = preprocess_text(user_input)
+        input_tokens = tokenize_urdu(processed_input)
+
+        with metrics.stage("qa_direct_match"):
+            # Direct match check against questions and their alternative phrasings
+            for question, processed, tokens in self.phrasings:
+                if combined_similarity(processed_input, input_tokens, processed, tokens, threshold=0.8) > 0.8:
+                    return question
+
+        with metrics.stage("qa_keyword_match"):
+            # Keyword matching with improved weighting
+            best_match = None
+            highest_score = 0
+
+            # Lower threshold for short queries
+            threshold = 2 if len(processed_input.split()) <= 3 else 3
+
+            input_lower = processed_input.lower()
+            found_keywords = {keyword for priority, keyword in self.keyword_matcher.find_all(input_lower)}
+            category_hits = {}
+            for priority, category in self.category_matcher.find_all(input_lower):
+                category_hits[category] = category_hits.get(category, 0) + 1
+
+            for question, weighted, category in self.keyword_entries:
+                score = 0
+
+                for keyword, weight in weighted:
+                    if keyword in found_keywords:
+                        score += weight
+
+                # Boost category relevance for each category keyword present
+                for _ in range(category_hits.get(category, 0)):
+                    score += 2
+
+                if score > highest_score:
+                    highest_score = score
+                    best_match = question
+
+            # Return keyword match if score is above threshold
+            if highest_score >= threshold:
+                return best_match
+
+        with metrics.stage("qa_fuzzy_match"):
+            # Fuzzy matching as a fallback
+            best_match = None
+            highest_similarity = 0
+
+            for question, processed, tokens in self.question_texts:
+                similarity = combined_similarity(processed_input, input_tokens, processed, tokens, threshold=0.5)
+                if similarity > highest_similarity:
+                    highest_similarity = similarity
+                    best_match = question
+
+            if highest_similarity > 0.5:
+                return best_match
+
+            return None
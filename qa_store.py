@@ -0,0 +1,155 @@
+# qa_store.py
+"""
+Versioned snapshots of the QA data with background reloading.
+
+A QASnapshot holds the parsed QA data and everything derived from it (the
+matching index, the id, category and related-question lookups and the
+typeahead index) and is
+never modified once published. QAStore builds a new snapshot off the request
+path and publishes it with a single reference assignment, so a request that
+reads `store.snapshot` once works against one consistent version even while
+a reload is running. An optional watcher thread polls the file's mtime and
+size and reloads when they change.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+
+from typeahead import TypeaheadIndex
+
+logger = logging.getLogger('QAStore')
+
+
+class QASnapshot:
+    """One immutable version of the QA data and its derived indexes"""
+    __slots__ = ('version', 'data', 'index', 'signature',
+                 'questions_by_id', 'questions_by_category', 'related', 'typeahead')
+
+    def __init__(self, version, data, index, signature=None):
+        self.version = version
+        self.data = data
+        self.index = index
+        # (mtime_ns, size) of the file the snapshot was loaded from
+        self.signature = signature
+
+        questions = data.get("questions", [])
+        by_id = {}
+        by_category = {}
+        for question in questions:
+            if "id" in question:
+                by_id[question["id"]] = question
+            if "category" in question:
+                by_category.setdefault(question["category"], []).append(question)
+        self.questions_by_id = MappingProxyType(by_id)
+        self.questions_by_category = MappingProxyType(
+            {category: tuple(members) for category, members in by_category.items()})
+
+        # Explicit related_questions resolved to question objects, keyed by question id
+        self.related = MappingProxyType({
+            question_id: self.resolve_ids(question.get("related_questions", []))
+            for question_id, question in by_id.items()
+        })
+
+        # Substring suggestions for /search
+        self.typeahead = TypeaheadIndex(questions)
+
+    def resolve_ids(self, question_ids):
+        """Return the questions with the given ids, skipping unknown ones"""
+        return tuple(self.questions_by_id[q_id] for q_id in question_ids if q_id in self.questions_by_id)
+
+    def related_questions(self, question):
+        """Return the explicitly related questions of a question"""
+        question_id = question.get("id")
+        if question_id in self.related and self.questions_by_id[question_id] is question:
+            return self.related[question_id]
+        # Not a question of this snapshot
+        return self.resolve_ids(question.get("related_questions", []))
+
+
+class QAStore:
+    """Loads QA data into snapshots and swaps them in atomically"""
+
+    def __init__(self, path, build_index):
+        self.path = path
+        self.build_index = build_index
+        self.snapshot = None
+        self.listeners = []
+        # Serializes builders only; readers never take it
+        self.load_lock = threading.RLock()
+        self.failed_signature = None
+        self.watcher = None
+        self.watcher_pid = None
+
+    def file_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        """Parse the file, build its indexes and publish the new snapshot; raises on failure"""
+        with self.load_lock:
+            signature = self.file_signature()
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            index = self.build_index(data)
+
+            previous = self.snapshot
+            version = previous.version + 1 if previous else 1
+            snapshot = QASnapshot(version, data, index, signature)
+            # Publishing is a single reference assignment
+            self.snapshot = snapshot
+            self.failed_signature = None
+            logger.info(f"Loaded QA data version {version} from {self.path} "
+                        f"({len(data.get('questions', []))} questions)")
+
+        for listener in self.listeners:
+            listener(snapshot)
+        return snapshot
+
+    def get(self):
+        """Return the current snapshot, loading the file on first use"""
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return snapshot
+        with self.load_lock:
+            # Another thread may have finished loading while this one waited
+            return self.snapshot or self.load()
+
+    def on_publish(self, listener):
+        """Call listener(snapshot) after each new snapshot is published"""
+        self.listeners.append(listener)
+
+    def reload_if_changed(self):
+        """Reload when the file's mtime or size changed; returns the new snapshot or None"""
+        try:
+            signature = self.file_signature()
+        except OSError as e:
+            logger.warning(f"Cannot stat {self.path}: {e}")
+            return None
+
+        snapshot = self.snapshot
+        if (snapshot is not None and signature == snapshot.signature) or signature == self.failed_signature:
+            return None
+        try:
+            return self.load()
+        except Exception as e:
+            # Keep serving the current snapshot; a later write to the file gets another try
+            self.failed_signature = signature
+            logger.error(f"Failed to reload QA data from {self.path}: {e}")
+            return None
+
+    def start_watching(self, interval):
+        """Start the watcher thread in this process, once; threads do not survive a fork"""
+        if interval <= 0 or self.watcher_pid == os.getpid():
+            return
+        self.watcher_pid = os.getpid()
+        self.watcher = threading.Thread(target=self.watch, args=(interval,), name='qa-data-watcher', daemon=True)
+        self.watcher.start()
+        logger.info(f"Watching {self.path} for changes every {interval}s")
+
+    def watch(self, interval):
+        while True:
+            time.sleep(interval)
+            self.reload_if_changed()
@@ -0,0 +1,267 @@
+# search_engines.py
+"""
+Retrieval engines used by QuranModelWrapper to score verses against a query.
+Each engine is built once from the indexed verse records and returns the best
+(score, position, methods) tuples together with the total number of matches.
+"""
+import difflib
+import heapq
+import logging
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+import numpy as np
+
+logger = logging.getLogger('SearchEngines')
+
+
+class LegacySearchEngine:
+    """Word, substring and SequenceMatcher scoring over a token posting-list index"""
+    name = "legacy"
+
+    def __init__(self, verses):
+        self.verses = verses
+        self.token_index = {}
+        for position, verse in enumerate(verses):
+            for token in set(verse["normalized"].lower().split()):
+                self.token_index.setdefault(token, []).append(position)
+
+        # Verse positions ordered by length, used to find fuzzy-match candidates
+        self.length_order = sorted(range(len(verses)), key=lambda i: len(verses[i]["normalized"]))
+        self.sorted_lengths = [len(verses[i]["normalized"]) for i in self.length_order]
+        # Character counts give a cheap upper bound on the SequenceMatcher ratio
+        self.char_counts = [Counter(verse["normalized"]) for verse in verses]
+        logger.info(f"Indexed {len(verses)} verses with {len(self.token_index)} distinct tokens")
+
+    def word_positions(self, word):
+        """Return the positions of verses with a token containing word"""
+        positions = set()
+        # Word matching is substring based, so include every token containing the word
+        for token, postings in self.token_index.items():
+            if word in token:
+                positions.update(postings)
+        return positions
+
+    def candidate_positions(self, query, query_words, word_cache=None):
+        """Return the positions of verses that can score above zero for the query
+
+        word_cache maps lowercased words to their positions and lets a batch
+        of queries share the token scan for words they have in common.
+        """
+        if not query:
+            # An empty query is contained in every verse
+            return range(len(self.verses))
+
+        candidates = set()
+        for word in query_words:
+            word = word.lower()
+            if word_cache is None:
+                candidates.update(self.word_positions(word))
+                continue
+            if word not in word_cache:
+                word_cache[word] = self.word_positions(word)
+            candidates.update(word_cache[word])
+
+        # SequenceMatcher.ratio() can only exceed 0.5 when the lengths are within a factor of 3
+        query_length = len(query)
+        start = bisect_right(self.sorted_lengths, query_length / 3)
+        end = bisect_left(self.sorted_lengths, query_length * 3)
+        candidates.update(self.length_order[start:end])
+
+        return sorted(candidates)
+
+    def fuzzy_ratio(self, query, query_counts, position, threshold):
+        """SequenceMatcher ratio against a verse, or an upper bound when it cannot exceed threshold"""
+        normalized_verse = self.verses[position]["normalized"]
+        total_length = len(query) + len(normalized_verse)
+
+        # Stage 1: length bound, as SequenceMatcher.real_quick_ratio()
+        bound = 2.0 * min(len(query), len(normalized_verse)) / total_length
+        if bound <= threshold:
+            return bound
+
+        # Stage 2: shared character bound, as SequenceMatcher.quick_ratio()
+        verse_counts = self.char_counts[position]
+        shared = sum(min(count, verse_counts[char]) for char, count in query_counts.items() if char in verse_counts)
+        bound = 2.0 * shared / total_length
+        if bound <= threshold:
+            return bound
+
+        return difflib.SequenceMatcher(None, query, normalized_verse).ratio()
+
+    def score_verse(self, position, query, query_words, query_lower, query_counts):
+        """Score one verse against the query, returning (score, methods)"""
+        verse = self.verses[position]
+        normalized_verse = verse["normalized"]
+
+        score = 0
+        methods = []
+
+        if query_lower == verse["lower"]:
+            score = 1.0
+            methods.append("exact_match")
+        elif query_lower in verse["lower"]:
+            score = 0.9
+            methods.append("contains_match")
+        else:
+            matching_words = sum(1 for word in query_words if word in normalized_verse)
+            if matching_words > 0:
+                score = max(score, matching_words / len(query_words) * 0.8)
+                methods.append("word_match")
+            fuzzy_score = self.fuzzy_ratio(query, query_counts, position, 0.5)
+            if fuzzy_score > 0.5:
+                score = max(score, fuzzy_score * 0.7)
+                methods.append("fuzzy_match")
+
+        return score, methods
+
+    def search(self, query, top_k=None, min_score=0, word_cache=None):
+        """Score a normalized query, returning (best matches, total matches)"""
+        query_words = query.split()
+        query_lower = query.lower()
+        query_counts = Counter(query)
+
+        total_matches = 0
+
+        def scored_verses():
+            nonlocal total_matches
+            for position in self.candidate_positions(query, query_words, word_cache):
+                score, methods = self.score_verse(position, query, query_words, query_lower, query_counts)
+                if score > 0 and score >= min_score:
+                    total_matches += 1
+                    yield score, position, methods
+
+        # nlargest keeps a heap of top_k entries and, like a stable sort, keeps verse order on ties
+        if top_k is None:
+            best = sorted(scored_verses(), key=lambda x: x[0], reverse=True)
+        else:
+            best = heapq.nlargest(max(top_k, 0), scored_verses(), key=lambda x: x[0])
+
+        return best, total_matches
+
+    def search_batch(self, queries, top_k=None, min_score=0):
+        """Score several normalized queries, returning a (best matches, total matches) pair for each
+
+        The legacy scores are per-pair SequenceMatcher and substring checks
+        with no vectorized form, so the batch only shares the posting-list
+        scan for words the queries have in common.
+        """
+        word_cache = {}
+        return [self.search(query, top_k=top_k, min_score=min_score, word_cache=word_cache) for query in queries]
+
+    def iter_search(self, query, top_k=None, min_score=0, stats=None):
+        """Yield the same matches as search() in score order, as early as they are known
+
+        Exact and contains matches (0.9 and above) always outrank word and
+        fuzzy matches (0.8 at most), so they are yielded before the
+        expensive scoring pass over the remaining candidates. stats
+        receives total_matches once the generator is exhausted.
+        """
+        query_words = query.split()
+        query_lower = query.lower()
+        query_counts = Counter(query)
+        limit = len(self.verses) if top_k is None else max(top_k, 0)
+        candidates = self.candidate_positions(query, query_words)
+
+        # First tier: substring matches only need a containment check
+        direct = []
+        for position in candidates:
+            lower = self.verses[position]["lower"]
+            if query_lower in lower:
+                score, methods = (1.0, ["exact_match"]) if query_lower == lower else (0.9, ["contains_match"])
+                if score >= min_score:
+                    direct.append((score, position, methods))
+        direct.sort(key=lambda x: x[0], reverse=True)
+        yield from direct[:limit]
+
+        # Second tier: word and fuzzy scoring, still needed for the true match count
+        def scored_verses():
+            for position in candidates:
+                if query_lower in self.verses[position]["lower"]:
+                    continue
+                score, methods = self.score_verse(position, query, query_words, query_lower, query_counts)
+                if score > 0 and score >= min_score:
+                    yield score, position, methods
+
+        remaining = max(limit - len(direct), 0)
+        total_matches = len(direct)
+        if remaining:
+            scored = list(scored_verses())
+            total_matches += len(scored)
+            yield from heapq.nlargest(remaining, scored, key=lambda x: x[0])
+        else:
+            total_matches += sum(1 for _ in scored_verses())
+
+        if stats is not None:
+            stats["total_matches"] = total_matches
+
+
+class TfidfSearchEngine:
+    """Cosine similarity over a character n-gram TF-IDF matrix of the translations"""
+    name = "tfidf"
+
+    # Character n-grams cope with Urdu spelling variants and attached particles
+    NGRAM_RANGE = (2, 4)
+    # Almost every verse shares some n-gram with a query, so ignore the long tail
+    MIN_SIMILARITY = 0.1
+    # Queries scored per matrix product in search_batch
+    BATCH_SIZE = 256
+
+    def __init__(self, verses):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self.verses = verses
+        self.vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=self.NGRAM_RANGE,
+                                          sublinear_tf=True, lowercase=True)
+        # Rows are L2-normalized, so a dot product with a query vector is the cosine similarity
+        self.matrix = self.vectorizer.fit_transform([verse["normalized"] for verse in verses]).tocsr()
+        logger.info(f"Built TF-IDF matrix {self.matrix.shape} with {self.matrix.nnz} non-zeros")
+
+    def score(self, query):
+        """Return the cosine similarity of every verse to the query"""
+        query_vector = self.vectorizer.transform([query])
+        return (self.matrix @ query_vector.T).toarray().ravel()
+
+    def search(self, query, top_k=None, min_score=0):
+        """Score a normalized query, returning (best matches, total matches)"""
+        if not query:
+            return [], 0
+
+        return self.top_matches(self.score(query), top_k, min_score)
+
+    def search_batch(self, queries, top_k=None, min_score=0):
+        """Score several normalized queries, returning a (best matches, total matches) pair for each"""
+        results = [([], 0)] * len(queries)
+        indices = [index for index, query in enumerate(queries) if query]
+
+        # One sparse matrix product scores a whole chunk of queries; chunking bounds the dense result
+        for start in range(0, len(indices), self.BATCH_SIZE):
+            chunk = indices[start:start + self.BATCH_SIZE]
+            query_matrix = self.vectorizer.transform([queries[index] for index in chunk])
+            scores = (self.matrix @ query_matrix.T).toarray()
+            for column, index in enumerate(chunk):
+                results[index] = self.top_matches(scores[:, column], top_k, min_score)
+
+        return results
+
+    def top_matches(self, scores, top_k=None, min_score=0):
+        """Select the best matches from a vector of verse scores, returning (best matches, total matches)"""
+        matched = np.flatnonzero(scores >= max(min_score, self.MIN_SIMILARITY))
+        total_matches = len(matched)
+
+        if top_k is not None and top_k < total_matches:
+            if top_k <= 0:
+                return [], total_matches
+            # argpartition finds the top_k in linear time; only those get sorted
+            matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+
+        # Highest score first, verse order on ties
+        matched = matched[np.lexsort((matched, -scores[matched]))]
+        best = [(float(scores[position]), int(position), ["tfidf_match"]) for position in matched]
+        return best, total_matches
+
+
+SEARCH_ENGINES = {
+    LegacySearchEngine.name: LegacySearchEngine,
+    TfidfSearchEngine.name: TfidfSearchEngine
+}
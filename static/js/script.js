@@ -11,6 +11,20 @@ document.addEventListener('DOMContentLoaded', function() {
     // Track loading states
     let isProcessing = false;
     
+    // Minimum time the typing indicator stays visible, so instant answers still feel natural
+    const MIN_THINKING_MS = 200;
+    
+    // Typeahead: wait for a pause in typing, and only keep the latest /search request
+    const SUGGEST_DELAY_MS = 150;
+    let suggestTimer = null;
+    let suggestController = null;
+    
+    const suggestionsList = document.createElement('ul');
+    suggestionsList.id = 'question-suggestions';
+    suggestionsList.className = 'hidden bg-white border border-gray-200 rounded-lg shadow-sm mt-1 overflow-hidden md:max-w-md md:mx-auto w-full text-sm';
+    suggestionsList.setAttribute('role', 'listbox');
+    questionInput.parentElement.insertAdjacentElement('afterend', suggestionsList);
+    
     // Focus input field on load
     questionInput.focus();
 
@@ -29,9 +43,18 @@ document.addEventListener('DOMContentLoaded', function() {
         if (event.key === 'Enter' && !isProcessing) {
             event.preventDefault();
             sendQuestion();
+        } else if (event.key === 'Escape') {
+            hideSuggestions();
         }
     });
     
+    questionInput.addEventListener('input', function() {
+        clearTimeout(suggestTimer);
+        suggestTimer = setTimeout(loadSuggestions, SUGGEST_DELAY_MS);
+    });
+    
+    questionInput.addEventListener('blur', hideSuggestions);
+    
     // Add tap to scroll to bottom on mobile
     chatContainer.addEventListener('click', function() {
         if (window.innerWidth < 768) {
@@ -135,6 +158,7 @@ document.addEventListener('DOMContentLoaded', function() {
         
         // Set processing state
         isProcessing = true;
+        hideSuggestions();
         
         // Add user message to chat
         addMessage(question, 'user');
@@ -147,9 +171,101 @@ document.addEventListener('DOMContentLoaded', function() {
         
         // Show typing indicator
         showTypingIndicator();
+        const requestStart = Date.now();
+        
+        // Stream the answer where the browser can read response bodies, otherwise use /ask
+        const request = (window.ReadableStream && window.TextDecoder)
+            ? streamQuestion(question, requestStart)
+            : askQuestion(question, requestStart);
+        
+        request
+            .catch(error => {
+                console.error('Error sending question:', error);
+                removeTypingIndicator();
+                addMessage('معذرت، کوئی مسئلہ پیش آگیا ہے۔ براہ کرم دوبارہ کوشش کریں۔', 'bot', 'error');
+            })
+            .then(() => {
+                // Reset processing state
+                isProcessing = false;
+                questionInput.disabled = false;
+                sendButton.disabled = false;
+                sendButton.classList.remove('opacity-50');
+                questionInput.focus();
+            });
+    }
+    
+    function loadSuggestions() {
+        const query = questionInput.value.trim();
+        
+        // A newer keystroke makes any request still in flight useless
+        if (suggestController) suggestController.abort();
+        suggestController = null;
+        
+        if (query.length < 2 || isProcessing) {
+            hideSuggestions();
+            return;
+        }
+        
+        const controller = window.AbortController ? new AbortController() : null;
+        suggestController = controller;
         
+        fetch('/search', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ query: query }),
+            signal: controller ? controller.signal : undefined
+        })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('Network response was not ok');
+                }
+                return response.json();
+            })
+            .then(data => {
+                // Without AbortController an older response can still arrive late
+                if (suggestController !== controller || questionInput.value.trim() !== query) return;
+                suggestController = null;
+                showSuggestions(data.results || []);
+            })
+            .catch(error => {
+                if (error.name !== 'AbortError') {
+                    console.error('Error loading suggestions:', error);
+                }
+            });
+    }
+    
+    function showSuggestions(results) {
+        suggestionsList.innerHTML = '';
+        
+        results.forEach(result => {
+            const item = document.createElement('li');
+            item.className = 'px-3 py-2 cursor-pointer hover:bg-emerald-50 text-gray-800';
+            item.setAttribute('role', 'option');
+            item.textContent = result.question;
+            // mousedown runs before the input's blur, which would hide the list
+            item.addEventListener('mousedown', function(event) {
+                event.preventDefault();
+                window.setQuestion(result.question);
+            });
+            suggestionsList.appendChild(item);
+        });
+        
+        suggestionsList.classList.toggle('hidden', results.length === 0);
+    }
+    
+    function hideSuggestions() {
+        clearTimeout(suggestTimer);
+        if (suggestController) suggestController.abort();
+        suggestController = null;
+        suggestionsList.classList.add('hidden');
+        suggestionsList.innerHTML = '';
+    }
+    
+    function askQuestion(question, requestStart) {
         // Send question to server
-        fetch('/ask', {
+        return fetch('/ask', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -162,35 +278,114 @@ document.addEventListener('DOMContentLoaded', function() {
             }
             return response.json();
         })
+        .then(data => afterMinThinking(requestStart, data))
         .then(data => {
             // Remove typing indicator
             removeTypingIndicator();
             
             // Add bot message to chat
-            addMessage(data.answer, 'bot');
+            const messageDiv = addMessage(data.answer, 'bot');
             
-            
-            // Reset processing state
-            isProcessing = false;
-            questionInput.disabled = false;
-            sendButton.disabled = false;
-            sendButton.classList.remove('opacity-50');
-            questionInput.focus();
+            // Verse search answers carry further matches as a paginated list
+            if (data.verses) {
+                addVerseResults(messageDiv, data.query, data.verses.slice(1), data.next_offset);
+            }
+        });
+    }
+    
+    function afterMinThinking(requestStart, value) {
+        // Keep the typing indicator up for at least MIN_THINKING_MS
+        const remaining = MIN_THINKING_MS - (Date.now() - requestStart);
+        return new Promise(resolve => setTimeout(() => resolve(value), Math.max(0, remaining)));
+    }
+    
+    function streamQuestion(question, requestStart) {
+        // Render the answer as soon as it arrives, then each verse match as it is found
+        let messageDiv = null;
+        let verseResults = null;
+        let query = question;
+        
+        return fetch('/ask-stream', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ question: question }),
         })
-        .catch(error => {
-            console.error('Error sending question:', error);
-            removeTypingIndicator();
-            addMessage('معذرت، کوئی مسئلہ پیش آگیا ہے۔ براہ کرم دوبارہ کوشش کریں۔', 'bot', 'error');
-            
-            // Reset processing state
-            isProcessing = false;
-            questionInput.disabled = false;
-            sendButton.disabled = false;
-            sendButton.classList.remove('opacity-50');
-            questionInput.focus();
+        .then(response => {
+            if (!response.ok || !response.body) {
+                throw new Error('Network response was not ok');
+            }
+            // Events arriving meanwhile stay buffered in the body until the delay is over
+            return afterMinThinking(requestStart, response);
+        })
+        .then(response => {
+            return readEventStream(response, (event, data) => {
+                if (event === 'answer') {
+                    removeTypingIndicator();
+                    messageDiv = addMessage(data.answer, 'bot');
+                    query = data.query || question;
+                    // Cached search answers arrive complete with their first page
+                    if (data.verses) {
+                        addVerseResults(messageDiv, query, data.verses.slice(1), data.next_offset);
+                    }
+                } else if (event === 'verse' && messageDiv) {
+                    if (!verseResults) {
+                        verseResults = createVerseResults(messageDiv);
+                    }
+                    appendVerseItems(verseResults.list, [data]);
+                    scrollToBottom();
+                } else if (event === 'done' && messageDiv && data.next_offset != null) {
+                    if (!verseResults) {
+                        verseResults = createVerseResults(messageDiv);
+                    }
+                    addLoadMoreButton(verseResults, query, data.next_offset);
+                }
+            });
+        })
+        .then(() => {
+            if (!messageDiv) {
+                throw new Error('Stream ended without an answer');
+            }
         });
     }
     
+    function readEventStream(response, onEvent) {
+        // Minimal Server-Sent Events parser over a fetch response body
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        
+        function pump() {
+            return reader.read().then(({ done, value }) => {
+                if (done) {
+                    return;
+                }
+                buffer += decoder.decode(value, { stream: true });
+                
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const frame = buffer.slice(0, boundary);
+                    buffer = buffer.slice(boundary + 2);
+                    
+                    let event = 'message';
+                    let data = '';
+                    frame.split('\n').forEach(line => {
+                        if (line.startsWith('event:')) {
+                            event = line.slice(6).trim();
+                        } else if (line.startsWith('data:')) {
+                            data += line.slice(5).trim();
+                        }
+                    });
+                    onEvent(event, data ? JSON.parse(data) : {});
+                }
+                return pump();
+            });
+        }
+        
+        return pump();
+    }
+    
     function addMessage(text, sender, type = 'normal') {
         // Create message element
         const messageDiv = document.createElement('div');
@@ -242,83 +437,86 @@ document.addEventListener('DOMContentLoaded', function() {
         
         // Ensure the chat container scrolls to the bottom after each new message
         scrollToBottom();
+        
+        return messageDiv;
     }
     
-    function formatVerseText(text) {
-        // Check if this contains Quranic references
-        if (!text.includes('📖')) {
-            return text; // Return as is if no references
+    function addVerseResults(messageDiv, query, verses, nextOffset) {
+        if (verses.length === 0 && nextOffset === null) {
+            return;
         }
         
-        // Split by multiple verses if they exist
-        if (text.includes('**مزید متعلقہ نتائج:**')) {
-            const parts = text.split('**مزید متعلقہ نتائج:**');
-            const mainVerse = formatSingleVerse(parts[0].trim());
-            
-            // Format additional verses if they exist
-            let additionalVerses = '';
-            if (parts.length > 1 && parts[1].trim()) {
-                // Split additional results by numbered items
-                const additionalParts = parts[1].trim().split(/\d+\.\s+/);
-                
-                // Extract all additional references (skip the first empty split)
-                const references = [];
-                for (let i = 1; i < additionalParts.length; i++) {
-                    if (additionalParts[i].trim()) {
-                        references.push(formatSingleReference(additionalParts[i].trim(), i));
-                    }
+        const results = createVerseResults(messageDiv);
+        appendVerseItems(results.list, verses);
+        
+        if (nextOffset !== null) {
+            addLoadMoreButton(results, query, nextOffset);
+        }
+        scrollToBottom();
+    }
+    
+    function createVerseResults(messageDiv) {
+        const container = document.createElement('div');
+        container.className = 'mt-4 pt-2 border-t border-emerald-200';
+        container.innerHTML = `
+            <p class="text-emerald-700 font-semibold mb-2">مزید متعلقہ نتائج:</p>
+            <div class="verse-results"></div>`;
+        messageDiv.querySelector('.bot-message > div').appendChild(container);
+        return { container: container, list: container.querySelector('.verse-results') };
+    }
+    
+    function addLoadMoreButton(results, query, nextOffset) {
+        // Further pages are only fetched when the user asks for them
+        const button = document.createElement('button');
+        button.className = 'mazeed-maloomat-btn';
+        button.innerHTML = 'مزید معلومات <i class="fas fa-chevron-down"></i>';
+        button.addEventListener('click', function() {
+            button.disabled = true;
+            fetch('/search-verses', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ query: query, offset: nextOffset }),
+            })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('Network response was not ok');
                 }
-                
-                // Show only first 3 references initially
-                const initialReferences = references.slice(0, 3).join('');
-                const hiddenReferences = references.length > 3 ? references.slice(3).join('') : '';
-                
-                // Create the container with visible and hidden references
-                additionalVerses = `
-                    <div class="mt-4 pt-2 border-t border-emerald-200">
-                        <p class="text-emerald-700 font-semibold mb-2">مزید متعلقہ نتائج:</p>
-                        <div class="initial-references">
-                            ${initialReferences}
-                        </div>`;
-                
-                // Only add the button and hidden container if there are more than 3 references
-                if (references.length > 3) {
-                    additionalVerses += `
-                        <button class="mazeed-maloomat-btn" onclick="toggleAdditionalReferences(this)">
-                            مزید معلومات <i class="fas fa-chevron-down"></i>
-                        </button>
-                        <div class="additional-references">
-                            ${hiddenReferences}
-                        </div>`;
+                return response.json();
+            })
+            .then(page => {
+                appendVerseItems(results.list, page.verses);
+                nextOffset = page.next_offset;
+                if (nextOffset === null) {
+                    button.remove();
+                } else {
+                    button.disabled = false;
                 }
-                
-                additionalVerses += `</div>`;
-            }
-            
-            return mainVerse + additionalVerses;
-        } else {
-            // Single verse reference
-            return formatSingleVerse(text);
-        }
+            })
+            .catch(error => {
+                console.error('Error loading more verses:', error);
+                button.disabled = false;
+            });
+        });
+        results.container.appendChild(button);
     }
     
-    // Helper function to format a single reference with index
-    function formatSingleReference(text, index) {
-        // Split the verse from the reference
-        const parts = text.split('📖');
-        
-        if (parts.length < 2) {
-            return ''; // Not a reference format we recognize
+    function appendVerseItems(list, verses) {
+        verses.forEach(match => {
+            list.insertAdjacentHTML('beforeend', `<div class="reference-item">
+                  <p class="reference-text">${match.verse}</p>
+                  <p class="reference-source">📖 ${match.reference}</p>
+                </div>`);
+        });
+    }
+    
+    function formatVerseText(text) {
+        // Answers carry at most one verse; further matches are rendered by addVerseResults
+        if (!text.includes('📖')) {
+            return text; // Return as is if no references
         }
-        
-        const verseText = parts[0].trim();
-        const reference = parts[1].trim();
-        
-        // Create formatted HTML for a reference item
-        return `<div class="reference-item">
-                  <p class="reference-text">${verseText}</p>
-                  <p class="reference-source">📖 ${reference}</p>
-                </div>`;
+        return formatSingleVerse(text);
     }
     
     function formatSingleVerse(text) {
@@ -399,27 +597,6 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     };
 
-    // Toggle function for Mazeed Maloomat button
-    window.toggleAdditionalReferences = function(button) {
-        const additionalReferences = button.nextElementSibling;
-        additionalReferences.classList.toggle('visible');
-        button.classList.toggle('active');
-        
-        // Change button text based on state
-        if (button.classList.contains('active')) {
-            button.innerHTML = 'چھپائیں <i class="fas fa-chevron-up"></i>';
-        } else {
-            button.innerHTML = 'مزید معلومات <i class="fas fa-chevron-down"></i>';
-        }
-        
-        // Scroll to make additional content visible if expanded
-        if (additionalReferences.classList.contains('visible')) {
-            setTimeout(() => {
-                additionalReferences.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
-            }, 100);
-        }
-    };
-    
     // Create default categories function
     function createDefaultCategories() {
         // Default categories
@@ -0,0 +1,94 @@
+# text_utils.py
+"""
+Text preprocessing and similarity helpers shared by the chatbot and its
+precomputed QA index
+"""
+import string
+from difflib import SequenceMatcher
+
+# Arabic letter forms folded to the Urdu forms used in the QA data and translations
+LETTER_VARIANTS = {
+    'ي': 'ی', 'ى': 'ی',             # Arabic yeh, alef maksura
+    'ك': 'ک',                       # Arabic kaf
+    'ه': 'ہ', 'ة': 'ہ', 'ۃ': 'ہ', 'ۂ': 'ہ',  # Arabic heh, teh marbuta, teh marbuta goal, heh with hamza
+    'أ': 'ا', 'إ': 'ا', 'ٱ': 'ا'    # Alef with hamza or wasla; alef madda is a letter of its own
+}
+
+# Diacritics (tashkeel), superscript alef, honorific signs, Quranic annotation marks,
+# tatweel and zero-width/direction characters carry no meaning for matching
+IGNORED_CHARACTERS = (
+    [chr(c) for c in range(0x0610, 0x061B)] + [chr(c) for c in range(0x064B, 0x0660)] + ['\u0670'] +
+    [chr(c) for c in range(0x06D6, 0x06EE)] + ['\u0640'] +
+    [chr(c) for c in range(0x200B, 0x2010)] + ['\u2060', '\ufeff']
+)
+
+URDU_PUNCTUATION = '۔،؟!؛:()'
+
+# Single table applied with str.translate
+URDU_NORMALIZATION = str.maketrans({
+    **LETTER_VARIANTS,
+    **{char: None for char in IGNORED_CHARACTERS},
+    **{char: ' ' for char in URDU_PUNCTUATION}
+})
+
+
+def normalize_urdu(text):
+    """Fold letter variants, drop diacritics and invisible characters, and turn punctuation into spaces"""
+    if '\u0653' in text:
+        # Alef followed by a combining madda is alef madda; the madda alone would be dropped
+        text = text.replace('ا\u0653', 'آ')
+    return text.translate(URDU_NORMALIZATION)
+
+
+def preprocess_text(text, is_urdu=True):
+    """Clean and normalize text for better matching"""
+    if not text:
+        return ""
+
+    # For Urdu text
+    if is_urdu:
+        text = normalize_urdu(text)
+    else:
+        # For English parts
+        # Remove punctuation
+        text = text.translate(str.maketrans('', '', string.punctuation))
+        # Convert to lowercase
+        text = text.lower()
+
+    # Normalize whitespace for both
+    return ' '.join(text.split())
+
+def tokenize_urdu(text):
+    """Tokenize Urdu text into words"""
+    # Basic tokenization by whitespace
+    tokens = text.split()
+    # Further clean tokens
+    return [token.strip() for token in tokens if token.strip()]
+
+def combined_similarity(query_processed, query_tokens, reference_processed, reference_tokens, threshold=None):
+    """Weighted sequence and word-overlap similarity of two preprocessed, tokenized texts
+
+    When a threshold is given and cheap upper bounds show the score cannot
+    exceed it, that bound is returned instead of running the full
+    SequenceMatcher comparison.
+    """
+    # Word Overlap
+    reference_set = reference_tokens if isinstance(reference_tokens, (set, frozenset)) else set(reference_tokens)
+    matching_words = sum(1 for word in query_tokens if word in reference_set)
+
+    # Calculate word overlap ratio
+    total_words = len(reference_set.union(query_tokens))
+    word_overlap = matching_words / total_words if total_words > 0 else 0
+
+    # String Sequence Matching, staged from cheapest to full ratio
+    matcher = SequenceMatcher(None, query_processed, reference_processed)
+    if threshold is not None:
+        # real_quick_ratio() and quick_ratio() are upper bounds of ratio()
+        for upper_bound in (matcher.real_quick_ratio, matcher.quick_ratio):
+            score_bound = (0.6 * upper_bound()) + (0.4 * word_overlap)
+            if score_bound <= threshold:
+                return score_bound
+    sequence_similarity = matcher.ratio()
+
+    # Combined similarity (weighted average)
+    return (0.6 * sequence_similarity) + (0.4 * word_overlap)
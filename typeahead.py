@@ -0,0 +1,189 @@
+# typeahead.py
+"""
+Typeahead index for /search suggestions.
+
+Questions, their alternative phrasings and keywords are normalized once and
+packed into one string per kind, each text starting with "\\n " so that the
+start of a text and the start of a word can be searched for directly. A
+query is looked up tier by tier, best rank first, with str.find running
+over the packed string in question order, so the search stops as soon as
+it has enough suggestions instead of visiting every matching text.
+
+Scanning is only fast while matches are plentiful, so trigrams found in few
+questions also keep the set of those questions: a query with such a trigram
+only checks the handful of questions that contain all of its rare trigrams.
+A query with a trigram that is not indexed at all matches nothing.
+"""
+from bisect import bisect_right
+
+from text_utils import preprocess_text
+
+# Kinds of indexed text
+QUESTION, PHRASING, KEYWORD = range(3)
+
+# Starts every packed text; normalized text never contains a newline
+TEXT_START = "\n "
+
+
+def normalize_for_search(text):
+    """Normalize text the same way for indexing and for queries"""
+    return preprocess_text(text).lower()
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class PackedTexts:
+    """Texts of one kind joined into a single string, in question order"""
+
+    def __init__(self):
+        self.parts = []
+        # Offset of each text in the packed string and the question it belongs to
+        self.starts = []
+        self.positions = []
+        self.length = 0
+        self.packed = ""
+
+    def add(self, text, position):
+        part = TEXT_START + text
+        self.parts.append(part)
+        self.starts.append(self.length)
+        self.positions.append(position)
+        self.length += len(part)
+
+    def pack(self):
+        self.packed = "".join(self.parts)
+        self.parts = None
+
+    def find(self, pattern, exclude, limit):
+        """Yield the question positions of texts containing pattern, in order, skipping exclude"""
+        packed, starts, positions = self.packed, self.starts, self.positions
+        found = 0
+        index = packed.find(pattern)
+        while index >= 0 and found < limit:
+            text_id = bisect_right(starts, index) - 1
+            position = positions[text_id]
+            if position not in exclude:
+                found += 1
+                yield position
+            # Later occurrences in the same text add nothing
+            if text_id + 1 == len(starts):
+                break
+            index = packed.find(pattern, starts[text_id + 1])
+
+
+class TypeaheadIndex:
+    """Substring typeahead over questions, phrasings and keywords, ranked best first"""
+
+    # Queries shorter than this return nothing
+    MIN_QUERY_LENGTH = 2
+    # Trigrams in at most this many questions keep their question positions
+    RARE_TRIGRAM_LIMIT = 64
+
+    def __init__(self, questions):
+        self.questions = questions
+        self.texts = {kind: PackedTexts() for kind in (QUESTION, PHRASING, KEYWORD)}
+        # (kind, normalized text) pairs of each question
+        self.question_texts = []
+        # Trigram -> positions of the questions containing it, or None once it is in too many
+        self.postings = {}
+
+        for position, question in enumerate(questions):
+            entries = [(QUESTION, question.get("question", ""))]
+            entries += [(PHRASING, alt) for alt in question.get("alternative_phrasings", [])]
+            entries += [(KEYWORD, keyword) for keyword in question.get("keywords", [])]
+
+            texts = []
+            for kind, text in entries:
+                normalized = normalize_for_search(text)
+                if normalized:
+                    self.texts[kind].add(normalized, position)
+                    texts.append((kind, normalized))
+            self.question_texts.append(texts)
+            self.add_postings(set().union(*(trigrams(text) for kind, text in texts)), position)
+
+        for texts in self.texts.values():
+            texts.pack()
+
+    def add_postings(self, grams, position):
+        postings = self.postings
+        for gram in grams:
+            positions = postings.get(gram, ())
+            if positions is None:
+                continue
+            if len(positions) >= self.RARE_TRIGRAM_LIMIT:
+                postings[gram] = None
+            elif positions:
+                positions.add(position)
+            else:
+                postings[gram] = {position}
+
+    @staticmethod
+    def rank(kind, text, query):
+        """Rank of the best match of query in text (see search), or None"""
+        if kind == QUESTION:
+            if text.startswith(query):
+                return 0
+            if " " + query in text:
+                return 1
+            return 2 if query in text else None
+        if kind == PHRASING:
+            if " " + query in " " + text:
+                return 3
+            return 4 if query in text else None
+        return 5 if query in text else None
+
+    def search(self, query, limit=5):
+        """Return up to limit questions containing the query, best ranked first, then in question order
+
+        Ranks: question starts with the query, a question word does, the
+        question contains it, a phrasing word starts with it, a phrasing
+        contains it, a keyword contains it.
+        """
+        query = normalize_for_search(query)
+        if len(query) < self.MIN_QUERY_LENGTH:
+            return []
+
+        query_trigrams = trigrams(query)
+        if any(gram not in self.postings for gram in query_trigrams):
+            return []
+        rare = [self.postings[gram] for gram in query_trigrams if self.postings[gram] is not None]
+        if rare:
+            return self.search_candidates(query, set.intersection(*rare), limit)
+        return self.search_packed(query, limit)
+
+    def search_candidates(self, query, candidates, limit):
+        """Rank the few questions that can contain the query one by one"""
+        ranked = []
+        for position in candidates:
+            ranks = [self.rank(kind, text, query) for kind, text in self.question_texts[position]]
+            ranks = [rank for rank in ranks if rank is not None]
+            if ranks:
+                ranked.append((min(ranks), position))
+        ranked.sort()
+        return [self.questions[position] for rank, position in ranked[:limit]]
+
+    def search_packed(self, query, limit):
+        """Scan the packed texts tier by tier until enough questions matched"""
+        # One scan per kind that does not contain the query at all, instead of one per tier
+        kinds = {kind for kind, texts in self.texts.items() if query in texts.packed}
+
+        tiers = (
+            (QUESTION, TEXT_START + query),
+            (QUESTION, " " + query),
+            (QUESTION, query),
+            (PHRASING, " " + query),
+            (PHRASING, query),
+            (KEYWORD, query)
+        )
+        # Insertion ordered: rank first, then question order within a rank
+        found = {}
+        for kind, pattern in tiers:
+            if len(found) >= limit:
+                break
+            if kind not in kinds:
+                continue
+            for position in self.texts[kind].find(pattern, found, limit - len(found)):
+                found[position] = None
+        return [self.questions[position] for position in found]
@@ -0,0 +1,158 @@
+# verse_store.py
+"""
+Compact, memory-mapped columnar store for the Quran translation data.
+
+The file holds a fixed header, a uint32 offsets array into a UTF-8 blob of
+translations, and uint16 Surah/Ayah arrays (all little-endian). It is opened
+with mmap, so loading it needs neither pickle nor pandas, and the file's
+pages are shared through the OS page cache. The search index built from it
+(QuranModelWrapper.build_index) is ordinary Python objects in each process;
+it is only shared when gunicorn preloads the app before forking.
+
+The store is a generated file and is not committed. Build it from the pickle
+at build or deploy time (again whenever the pickle changes) with:
+    python verse_store.py models/processed_quran.pkl models/quran_verses.bin
+"""
+import mmap
+import struct
+import sys
+import logging
+from array import array
+from pathlib import Path
+
+logger = logging.getLogger('VerseStore')
+
+MAGIC = b"QVS1"
+VERSION = 1
+# magic, version, verse count, blob offset
+HEADER = struct.Struct("<4sIII")
+
+
+def is_verse_store(path):
+    """Check whether path is a verse store file"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _layout(count):
+    """Return byte offsets of the offsets, surah, ayah and blob sections"""
+    offsets_start = HEADER.size
+    surah_start = offsets_start + 4 * (count + 1)
+    ayah_start = surah_start + 2 * count
+    # Keep the blob 4-byte aligned
+    blob_start = (ayah_start + 2 * count + 3) & ~3
+    return offsets_start, surah_start, ayah_start, blob_start
+
+
+def _column(buffer, typecode):
+    """View a little-endian section as typed values, copying only on big-endian hosts"""
+    if sys.byteorder == 'little':
+        return buffer.cast(typecode)
+    values = array(typecode, bytes(buffer))
+    values.byteswap()
+    return values
+
+
+class VerseStore:
+    """Read-only view over a memory-mapped verse store"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(self._mmap)
+        magic, version, count, blob_start = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} verse store")
+
+        offsets_start, surah_start, ayah_start, expected_blob_start = _layout(count)
+        if blob_start != expected_blob_start:
+            raise ValueError(f"{self.path} has an inconsistent layout")
+
+        self.count = count
+        self.offsets = _column(buffer[offsets_start:surah_start], 'I')
+        self.surahs = _column(buffer[surah_start:ayah_start], 'H')
+        self.ayahs = _column(buffer[ayah_start:ayah_start + 2 * count], 'H')
+        self.blob = buffer[blob_start:]
+
+    def __len__(self):
+        return self.count
+
+    def translation(self, position):
+        """Decode the translation of the verse at position"""
+        return str(self.blob[self.offsets[position]:self.offsets[position + 1]], 'utf-8')
+
+    def record(self, position):
+        """Return a verse as a dict with the same keys as the DataFrame columns"""
+        return {
+            "Surah": self.surahs[position],
+            "Ayah": self.ayahs[position],
+            "Translation": self.translation(position)
+        }
+
+    def records(self):
+        """Iterate over all verses in order"""
+        for position in range(self.count):
+            yield self.record(position)
+
+    def to_dict(self, orient='records'):
+        """Compatibility with DataFrame.to_dict('records')"""
+        if orient != 'records':
+            raise ValueError("VerseStore only supports orient='records'")
+        return list(self.records())
+
+
+def write_verse_store(records, path):
+    """Write (surah, ayah, translation) records to a verse store file"""
+    surahs = array('H')
+    ayahs = array('H')
+    offsets = array('I', [0])
+    blob = bytearray()
+    for surah, ayah, translation in records:
+        surahs.append(int(surah))
+        ayahs.append(int(ayah))
+        blob += str(translation).encode('utf-8')
+        offsets.append(len(blob))
+
+    count = len(surahs)
+    offsets_start, surah_start, ayah_start, blob_start = _layout(count)
+    if sys.byteorder != 'little':
+        for column in (offsets, surahs, ayahs):
+            column.byteswap()
+
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, count, blob_start))
+        f.write(offsets.tobytes())
+        f.write(surahs.tobytes())
+        f.write(ayahs.tobytes())
+        f.write(b"\0" * (blob_start - (ayah_start + 2 * count)))
+        f.write(blob)
+    # Replace atomically so readers never map a half-written file
+    tmp_path.replace(path)
+    return count
+
+
+def convert_pickle(pickle_path, store_path):
+    """Convert the pickled DataFrame model into a verse store"""
+    import pickle
+
+    with open(pickle_path, 'rb') as f:
+        frame = pickle.load(f)
+    records = zip(frame['Surah'], frame['Ayah'], frame['Translation'])
+    count = write_verse_store(records, store_path)
+    logger.info(f"Wrote {count} verses from {pickle_path} to {store_path}")
+    return count
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) != 3:
+        print("Usage: python verse_store.py <processed_quran.pkl> <quran_verses.bin>")
+        sys.exit(1)
+    convert_pickle(sys.argv[1], sys.argv[2])